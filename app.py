@@ -1,9 +1,18 @@
 import os
+import re
 import asyncio
 import logging
 import argparse
+import glob
 import shutil
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto
+import threading
+import time
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from uuid import uuid4
+import numpy as np
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -12,18 +21,242 @@ from telegram.ext import (
     CallbackQueryHandler,
     filters,
 )
-from typing import Optional, Dict
-from config import config, StorageMode
+from typing import Optional, List, Tuple, Callable
+from config import config, StorageMode, ReplyMode
 from utils.factories import create_llm_handler, create_vector_store
 from utils.xml_loader import load_properties_from_xml
+from utils.embedding_snapshot import load_embeddings, load_embedding_cache, save_embeddings, snapshot_key
+from models.property import PropertyMatch
 
 # Global handlers
 llm_handler = None
 vector_store = None
+query_batcher = None
 effective_storage_mode = None
 
-# Store property descriptions for callback handling
-property_descriptions: Dict[str, str] = {}
+# Single-pass MarkdownV2 conversion for LLM responses: '**' bold becomes '*',
+# other special characters are escaped ('*' is left alone so bold survives)
+_MDV2_RE = re.compile(r'\*\*|[_\[\]()~`>#+\-=|{}.!]')
+
+def _mdv2_sub(match: "re.Match") -> str:
+    token = match.group(0)
+    return '*' if token == '**' else '\\' + token
+
+# Delimiter between matches in single-message reply mode (MarkdownV2 escaped)
+MATCH_SEPARATOR = "\n\n\\-\\-\\-\n\n"
+
+# Streamed LLM responses edit the placeholder every N chunks or every interval seconds
+STREAM_EDIT_CHUNKS = 25
+STREAM_EDIT_INTERVAL = 0.5
+
+class SendRateLimiter:
+    """Token bucket: up to `burst` sends straight away, then `rate` sends per second"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a send slot only if one is free right now, for sends that may be skipped"""
+        self._refill()
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def acquire(self) -> None:
+        self._refill()
+        # Reserve the slot before sleeping so concurrent callers queue up behind it
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+# Telegram allows about 30 messages/second per bot and about one per second per chat,
+# with short bursts tolerated, so the first CHAT_SEND_BURST matches of a reply go out without delay
+telegram_send_limiter = SendRateLimiter(rate=30, burst=30)
+CHAT_SEND_RATE = 1.0
+CHAT_SEND_BURST = 5
+MAX_CHAT_LIMITERS = 2048
+chat_send_limiters: "OrderedDict[int, SendRateLimiter]" = OrderedDict()
+
+def chat_send_limiter(chat_id: int) -> SendRateLimiter:
+    """The rate limiter of one chat, created on first use; least recently used chats are evicted"""
+    limiter = chat_send_limiters.get(chat_id)
+    if limiter is None:
+        limiter = chat_send_limiters[chat_id] = SendRateLimiter(CHAT_SEND_RATE, CHAT_SEND_BURST)
+        if len(chat_send_limiters) > MAX_CHAT_LIMITERS:
+            chat_send_limiters.popitem(last=False)
+    chat_send_limiters.move_to_end(chat_id)
+    return limiter
+
+async def send_limited(chat_id: int, coro):
+    """Await a Telegram send once both the per-chat and the bot-wide rate limits allow it
+
+    Sends run concurrently only across different chats: within one chat, anything past
+    the first CHAT_SEND_BURST sends goes out one per second, in order
+    """
+    await chat_send_limiter(chat_id).acquire()
+    await telegram_send_limiter.acquire()
+    return await coro
+
+# Store property descriptions for callback handling, keyed by (chat_id, property_id)
+# and bounded so long-running bots don't grow without limit
+MAX_PROPERTY_DESCRIPTIONS = 2048
+property_descriptions: "OrderedDict[Tuple[int, str], str]" = OrderedDict()
+
+def remember_description(chat_id: int, prop_id: str, description: str) -> None:
+    """Store a description for the toggle button, evicting the oldest entries past the cap"""
+    key = (chat_id, prop_id)
+    property_descriptions[key] = description
+    property_descriptions.move_to_end(key)
+    if len(property_descriptions) > MAX_PROPERTY_DESCRIPTIONS:
+        property_descriptions.popitem(last=False)
+
+def get_description(chat_id: int, prop_id: str) -> Optional[str]:
+    """Look up a stored description, marking it as recently used"""
+    key = (chat_id, prop_id)
+    description = property_descriptions.get(key)
+    if description is not None:
+        property_descriptions.move_to_end(key)
+    return description
+
+class QueryCache:
+    """
+    LRU cache of search results keyed by the normalized query text.
+    Exact repeats are served by a SHA-256 lookup without touching the embedder;
+    near-duplicates fall back to cosine similarity against recent query embeddings.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 600.0, similarity_threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        # key -> (timestamp, normalized embedding, matches)
+        self._entries: "OrderedDict[str, Tuple[float, np.ndarray, List[PropertyMatch]]]" = OrderedDict()
+        # Row-aligned view of cached embeddings for the cosine fallback
+        self._keys: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _key(query: str) -> str:
+        normalized = " ".join(query.lower().split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
+
+    def _rebuild_matrix(self) -> None:
+        self._keys = list(self._entries.keys())
+        if self._keys:
+            self._matrix = np.vstack([self._entries[k][1] for k in self._keys])
+        else:
+            self._matrix = None
+
+    def _evict_expired(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [k for k, (ts, _, _) in self._entries.items() if ts < cutoff]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._rebuild_matrix()
+
+    def get(self, query: str) -> Optional[List[PropertyMatch]]:
+        """Return cached matches for an exact (normalized) repeat of the query"""
+        self._evict_expired()
+        key = self._key(query)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def get_similar(self, embedding: np.ndarray) -> Optional[List[PropertyMatch]]:
+        """Return cached matches for the most similar recent query above the threshold"""
+        if self._matrix is None:
+            return None
+        scores = np.dot(self._matrix, self._normalize(embedding))
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        key = self._keys[best]
+        self._entries.move_to_end(key)
+        return self._entries[key][2]
+
+    def put(self, query: str, embedding: np.ndarray, matches: List[PropertyMatch]) -> None:
+        """Store matches for the query, evicting the least recently used entry past capacity"""
+        key = self._key(query)
+        self._entries[key] = (time.monotonic(), self._normalize(embedding), matches)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._rebuild_matrix()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._rebuild_matrix()
+
+query_cache = QueryCache()
+
+class QueryBatcher:
+    """
+    Collects queries that arrive within a short window and embeds them in one
+    forward pass, resolving each caller's future with its own embedding.
+    """
+
+    def __init__(self, embed_fn: Callable[[List[str]], np.ndarray], max_batch: int = 32, max_wait_ms: float = 10.0):
+        self.embed_fn = embed_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def embed(self, query: str) -> np.ndarray:
+        """Queue a query for the next batch and wait for its embedding"""
+        if self._worker is None:
+            # Started lazily so the queue and task belong to the bot's running loop
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query, future))
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            try:
+                # Run the encoder off the event loop so other updates keep flowing
+                embeddings = await asyncio.to_thread(self.embed_fn, [query for query, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
 
 # Setup logging
 logging.basicConfig(
@@ -32,6 +265,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=1)
+def _chroma_db_path() -> str:
+    """Resolved path of the persistent Chroma database file"""
+    return os.path.join(os.path.abspath(config.chroma_persist_dir), '.chroma', 'chroma.sqlite3')
+
 def determine_storage_mode(cmd_storage_mode: Optional[StorageMode] = None) -> StorageMode:
     """
     Determine storage mode using the following priority:
@@ -58,12 +296,34 @@ def determine_storage_mode(cmd_storage_mode: Optional[StorageMode] = None) -> St
         return effective_storage_mode
 
     # Auto-detection has the lowest priority
-    chroma_dir = os.path.abspath(config.chroma_persist_dir)
-    chroma_db_exists = os.path.exists(os.path.join(chroma_dir, '.chroma', 'chroma.sqlite3'))
+    chroma_db_exists = os.path.exists(_chroma_db_path())
     effective_storage_mode = StorageMode.DISK if chroma_db_exists else StorageMode.MEMORY
     logger.info(f"Auto-detected storage mode: {effective_storage_mode.value}")
     return effective_storage_mode
 
+def load_properties_into_store(vector_store) -> int:
+    """Load properties from XML into the store, reusing saved embeddings when the feed is unchanged"""
+    folder_path = os.path.dirname(__file__)
+    xml_path = os.path.join(folder_path, "data", "properties.xml")
+    properties = load_properties_from_xml(xml_path)
+
+    embeddings = load_embeddings(xml_path, properties, vector_store.embedding_model_id)
+    if embeddings is not None:
+        logger.info("Using saved property embeddings")
+        key = snapshot_key(xml_path)
+    else:
+        # Listings whose text did not change since the last snapshot keep their vectors
+        cache = load_embedding_cache(xml_path, properties, vector_store.embedding_model_id)
+        if cache:
+            logger.info(f"Reusing saved embeddings for {len(cache)} unchanged property texts")
+        embeddings = vector_store.embed_properties(properties, cache=cache)
+        key = save_embeddings(xml_path, properties, vector_store.embedding_model_id, embeddings)
+
+    # int8 codes and the HNSW graph of large catalogs are saved with the snapshot they index
+    vector_store.use_index_cache(os.path.dirname(xml_path), key)
+    vector_store.load_precomputed(embeddings, properties)
+    return len(properties)
+
 def initialize_vector_store(force_reload: bool = False, storage_mode: Optional[StorageMode] = None):
     """Initialize vector store and load properties if needed"""
     # Determine effective storage mode
@@ -72,43 +332,48 @@ def initialize_vector_store(force_reload: bool = False, storage_mode: Optional[S
     # Update config with final storage mode
     config.storage_mode = effective_mode
     
+    chroma_dir = os.path.abspath(config.chroma_persist_dir)
+    # Remove trash left behind when a previous run died before its background delete finished
+    for stale_dir in glob.glob(f"{glob.escape(chroma_dir)}.trash.*"):
+        threading.Thread(target=shutil.rmtree, args=(stale_dir,), kwargs={"ignore_errors": True}, daemon=True).start()
+    
     # Create vector store instance
     # Delete chroma_db folder if force_reload is True
     if force_reload and effective_mode == StorageMode.DISK:
-        chroma_dir = os.path.abspath(config.chroma_persist_dir)
         if os.path.exists(chroma_dir):
             logger.info("Force reload: removing existing vector store directory")
-            shutil.rmtree(chroma_dir)
+            # Move the old store aside so loading can start right away, then delete it in the background
+            trash_dir = f"{chroma_dir}.trash.{uuid4().hex}"
+            os.replace(chroma_dir, trash_dir)
+            threading.Thread(target=shutil.rmtree, args=(trash_dir,), kwargs={"ignore_errors": True}, daemon=True).start()
     
     vector_store = create_vector_store(config)
     
     if effective_mode == StorageMode.MEMORY:
         # For memory mode, we always need to load vectors
         logger.info("Memory mode: loading properties from XML...")
-        folder_path = os.path.dirname(__file__)
-        xml_path = os.path.join(folder_path, "data", "properties.xml")
-        properties = load_properties_from_xml(xml_path)
-        vector_store.load_properties(properties)
-        logger.info(f"Loaded {len(properties)} properties into memory store")
+        count = load_properties_into_store(vector_store)
+        logger.info(f"Loaded {count} properties into memory store")
     else:
         # For disk mode, only load if forced or needed
         if force_reload:
             logger.info("Force reload requested for persistent storage")
-            folder_path = os.path.dirname(__file__)
-            xml_path = os.path.join(folder_path, "data", "properties.xml")
-            properties = load_properties_from_xml(xml_path)
-            vector_store.load_properties(properties)
-            logger.info(f"Reloaded {len(properties)} properties into persistent storage")
+            count = load_properties_into_store(vector_store)
+            logger.info(f"Reloaded {count} properties into persistent storage")
         elif vector_store.needs_loading():
             logger.info("No existing vector data found, loading from XML...")
-            folder_path = os.path.dirname(__file__)
-            xml_path = os.path.join(folder_path, "data", "properties.xml")
-            properties = load_properties_from_xml(xml_path)
-            vector_store.load_properties(properties)
-            logger.info(f"Loaded {len(properties)} properties into persistent storage")
+            count = load_properties_into_store(vector_store)
+            logger.info(f"Loaded {count} properties into persistent storage")
         else:
-            # Initialize store without loading new data
+            # Initialize store without loading new data; hits are resolved against the XML feed,
+            # and a matching embedding snapshot is mapped in for in-process search
             vector_store._initialize_store()
+            xml_path = os.path.join(os.path.dirname(__file__), "data", "properties.xml")
+            properties = load_properties_from_xml(xml_path)
+            embeddings = load_embeddings(xml_path, properties, vector_store.embedding_model_id, mmap=True)
+            if embeddings is not None:
+                vector_store.use_index_cache(os.path.dirname(xml_path), snapshot_key(xml_path))
+            vector_store.attach_properties(properties, embeddings)
             logger.info("Using existing persistent vector store")
     
     return vector_store
@@ -175,9 +440,7 @@ async def toggle_description(update: Update, context: ContextTypes.DEFAULT_TYPE)
     show_desc = show_desc == "1"
     
     # Get the property description
-    description = property_descriptions.get(prop_id, "Description not available")
-    if isinstance(description, dict) and 'es' in description:
-        description = description['es']
+    description = get_description(query.message.chat_id, prop_id) or "Description not available"
     
     # Create property display text
     base_text = query.message.text.split('\n\nDescription:')[0]  # Get text before description
@@ -200,6 +463,84 @@ async def toggle_description(update: Update, context: ContextTypes.DEFAULT_TYPE)
         logger.error(f"Error updating message: {str(e)}")
         await query.answer("Error updating message - text might be too long")
 
+async def stream_analysis(update: Update, user_query: str, matches: List[PropertyMatch]) -> None:
+    """Stream the LLM analysis into one message, editing it as tokens arrive"""
+    chat_id = update.message.chat_id
+    limiter = chat_send_limiter(chat_id)
+    placeholder = await send_limited(chat_id, update.message.reply_text("Analyzing matching properties..."))
+    response = ""
+    shown = ""
+    chunks_since_edit = 0
+    last_edit = time.monotonic()
+
+    async for chunk in llm_handler.stream_response(user_query, matches):
+        response += chunk
+        chunks_since_edit += 1
+        if chunks_since_edit >= STREAM_EDIT_CHUNKS or time.monotonic() - last_edit >= STREAM_EDIT_INTERVAL:
+            # Partial output may contain unbalanced markup, so show it as plain text
+            partial = response[:4096]
+            # Partial updates are skipped rather than queued when the chat is at its rate limit
+            if partial.strip() and partial != shown and limiter.try_acquire() and telegram_send_limiter.try_acquire():
+                try:
+                    await placeholder.edit_text(partial)
+                    shown = partial
+                except Exception as e:
+                    logger.warning(f"Error updating streamed response: {str(e)}")
+            chunks_since_edit = 0
+            last_edit = time.monotonic()
+
+    # Convert ** to * for markdown and escape special characters
+    final_text = _MDV2_RE.sub(_mdv2_sub, response)[:4096]
+    try:
+        await send_limited(chat_id, placeholder.edit_text(final_text, parse_mode='MarkdownV2'))
+    except Exception as e:
+        logger.warning(f"Falling back to plain text for streamed response: {str(e)}")
+        if response[:4096] != shown:
+            try:
+                await send_limited(chat_id, placeholder.edit_text(response[:4096]))
+            except Exception as e:
+                logger.warning(f"Error updating streamed response: {str(e)}")
+
+async def send_matches_per_property(update: Update, matches: List[PropertyMatch]) -> None:
+    """Send one message per match, each with its own description toggle"""
+    chat_id = update.message.chat_id
+    for match in matches:
+        prop = match.property
+        
+        # Store description for callback handling
+        remember_description(chat_id, str(prop.id), prop.description_text())
+        
+        # Get display text using property's method
+        display_text = prop.to_display_text()
+        
+        # Create keyboard with description toggle button
+        keyboard = [[InlineKeyboardButton(
+            "Show Description",
+            callback_data=f"desc_{prop.id}_1"
+        )]]
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        
+        # Sent one at a time so the best match always arrives first
+        try:
+            await send_limited(chat_id, update.message.reply_text(
+                display_text, reply_markup=reply_markup, parse_mode='MarkdownV2'
+            ))
+        except Exception as e:
+            logger.error(f"Error sending property details: {str(e)}")
+
+async def send_matches_single(update: Update, matches: List[PropertyMatch]) -> None:
+    """Send all matches in a single message (no description toggles)"""
+    text = ""
+    for match in matches:
+        display_text = match.property.to_display_text()
+        candidate = f"{text}{MATCH_SEPARATOR}{display_text}" if text else display_text
+        # Only add whole properties so MarkdownV2 escapes are never cut in half
+        if len(candidate) > 4096:
+            break
+        text = candidate
+    if text:
+        await update.message.reply_text(text, parse_mode='MarkdownV2')
+
 async def process_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle user messages"""
     if not update.message or not update.message.text:
@@ -211,8 +552,15 @@ async def process_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     await update.message.chat.send_action("typing")
     
     try:
-        # Search for matching properties
-        matches = vector_store.search(user_query, top_k=5)
+        # Search for matching properties, reusing results for repeated or near-duplicate queries
+        matches = query_cache.get(user_query)
+        if matches is None:
+            embedding = await query_batcher.embed(user_query)
+            matches = query_cache.get_similar(embedding)
+            if matches is None:
+                matches = vector_store.search_by_vector(embedding, top_k=5)
+                if matches:
+                    query_cache.put(user_query, embedding, matches)
         
         if not matches:
             await update.message.reply_text(
@@ -221,39 +569,14 @@ async def process_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             )
             return
 
-        # Generate high-level analysis using LLM
-        response = await llm_handler.generate_response(user_query, matches)
-        
-        # Convert ** to * for markdown and escape special characters
-        response = response.replace("**", "*")
-        special_chars = ['_', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-        for char in special_chars:
-            response = response.replace(char, f'\\{char}')
-            
-        await update.message.reply_text(response[:4096], parse_mode='MarkdownV2')
+        # Stream the high-level analysis from the LLM into a placeholder message
+        await stream_analysis(update, user_query, matches)
         
         # Send detailed information for each match
-        for match in matches[:5]:
-            prop = match.property
-            
-            # Store description for callback handling
-            if isinstance(prop.desc, dict) and 'es' in prop.desc:
-                property_descriptions[str(prop.id)] = prop.desc['es']
-            else:
-                property_descriptions[str(prop.id)] = "Description not available"
-            
-            # Get display text using property's method
-            display_text = prop.to_display_text()
-            
-            # Create keyboard with description toggle button
-            keyboard = [[InlineKeyboardButton(
-                "Show Description",
-                callback_data=f"desc_{prop.id}_1"
-            )]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            # Send property details
-            await update.message.reply_text(display_text, reply_markup=reply_markup, parse_mode='MarkdownV2')
+        if config.reply_mode == ReplyMode.SINGLE:
+            await send_matches_single(update, matches[:5])
+        else:
+            await send_matches_per_property(update, matches[:5])
             
     except Exception as e:
         logger.error(f"Error processing message: {str(e)}")
@@ -262,9 +585,19 @@ async def process_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             "Please try again or contact support if the problem persists."
         )
 
+def build_application(token: str) -> Application:
+    """Create the Telegram application with all bot handlers registered"""
+    application = Application.builder().token(token).build()
+    application.add_handler(CommandHandler("start", start))
+    application.add_handler(CommandHandler("help", help_command))
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, process_message))
+    application.add_handler(CallbackQueryHandler(toggle_description, pattern="^desc_"))
+    application.add_error_handler(handle_error)
+    return application
+
 def main() -> None:
     """Start the bot"""
-    global llm_handler, vector_store
+    global llm_handler, vector_store, query_batcher
 
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description="Real Estate Telegram Bot")
@@ -282,14 +615,17 @@ def main() -> None:
         force_reload=args.reload_vectors,
         storage_mode=StorageMode(args.storage_mode) if args.storage_mode else None
     )
+    query_batcher = QueryBatcher(vector_store.embed_queries)
+
+    # Use the libuv-based event loop when available (not supported on Windows)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        logger.info("uvloop not installed, using the default asyncio event loop")
 
     # Initialize and run bot
-    application = Application.builder().token(config.telegram_token).build()
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("help", help_command))
-    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, process_message))
-    application.add_handler(CallbackQueryHandler(toggle_description, pattern="^desc_"))
-    application.add_error_handler(handle_error)
+    application = build_application(config.telegram_token)
 
     logger.info("Starting bot...")
     application.run_polling(allowed_updates=Update.ALL_TYPES)
@@ -4,8 +4,15 @@ from typing import Optional
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+_DOTENV_LOADED = False
+_INSTANCE: Optional['Config'] = None
+
+def _load_dotenv_once() -> None:
+    """Load environment variables from .env file, parsing it at most once per process"""
+    global _DOTENV_LOADED
+    if not _DOTENV_LOADED:
+        load_dotenv()
+        _DOTENV_LOADED = True
 
 class VectorStoreType(str, Enum):
     CHROMA = "chroma"
@@ -20,14 +27,32 @@ class StorageMode(str, Enum):
     MEMORY = "memory"
     DISK = "disk"
 
+class ReplyMode(str, Enum):
+    PER_PROPERTY = "per_property"
+    SINGLE = "single"
+
 class Config(BaseModel):
     # Telegram
     telegram_token: str = Field(default="", description="Telegram Bot Token")
+    reply_mode: ReplyMode = Field(default=ReplyMode.PER_PROPERTY, description="One message per match, or all matches in one message")
     
     # Vector Store
     vector_store_type: VectorStoreType = Field(default=VectorStoreType.CHROMA)
     storage_mode: StorageMode = Field(default=StorageMode.MEMORY)
     chroma_persist_dir: str = Field(default="./chroma_db")
+    faiss_index_type: str = Field(default="SQ8", description="FAISS index_factory string, e.g. SQ8, SQfp16 or IVF{nlist},PQ16")
+    faiss_nprobe: int = Field(default=8, description="Inverted lists scanned per query by IVF indexes")
+    faiss_ef_search: int = Field(default=64, description="Candidate list size per query for HNSW indexes")
+    faiss_binary_prefilter: bool = Field(default=False, description="Prefilter flat/SQ indexes by Hamming distance over sign bits")
+    faiss_binary_rescore_factor: int = Field(default=40, description="Candidates per result rescored after the binary prefilter")
+    int8_min_items: int = Field(default=10000, description="Catalog size from which the in-process matrix is scanned as int8 codes (needs simsimd)")
+    hnsw_min_items: int = Field(default=50000, description="Catalog size from which the in-process matrix gets an HNSW graph (needs hnswlib)")
+    embedding_backend: str = Field(default="auto", description="Encoder runtime: auto, onnx, torch or static")
+    embedding_onnx_file: Optional[str] = Field(default=None, description="ONNX export to load; picked from the host CPU when unset")
+    embed_batch_size: int = Field(default=64, description="Texts per encoder forward pass")
+
+    # Data loading
+    xml_validate_first_row: bool = Field(default=True, description="Validate the first parsed property with pydantic")
     
     # LLM
     llm_type: LLMType = Field(default=LLMType.GPT)
@@ -37,34 +62,79 @@ class Config(BaseModel):
     
     # Server
     port: int = Field(default=5000)
+    num_threads: int = Field(default=0, description="Threads for FAISS and llama.cpp; 0 means one per usable physical core")
 
     @classmethod
     def load(cls) -> 'Config':
+        """Return the process-wide config, building it from the environment on first use"""
+        global _INSTANCE
+        if _INSTANCE is None:
+            _INSTANCE = cls._from_env()
+        return _INSTANCE
+
+    @classmethod
+    def reset_cache(cls) -> None:
+        """Forget the cached config so the next load() re-reads the environment"""
+        global _INSTANCE
+        _INSTANCE = None
+
+    @classmethod
+    def _from_env(cls) -> 'Config':
+        _load_dotenv_once()
+        # Snapshot the environment once instead of repeated os.getenv lookups
+        env = os.environ.copy()
+
         # Get environment variables with defaults
-        telegram_token = os.getenv("TELEGRAM_BOT_TOKEN", "")
+        telegram_token = env.get("TELEGRAM_BOT_TOKEN", "")
         if not telegram_token:
             raise ValueError("TELEGRAM_BOT_TOKEN environment variable is required")
             
-        vector_store_type = os.getenv("VECTOR_STORE_TYPE", "chroma").lower()
-        storage_mode = os.getenv("STORAGE_MODE", "memory").lower()
-        chroma_persist_dir = os.getenv("CHROMA_PERSIST_DIR", "./chroma_db")
-        llm_type = os.getenv("LLM_TYPE", "gpt").lower()
-        port = int(os.getenv("PORT", "5000"))
+        reply_mode = env.get("REPLY_MODE", "per_property").lower()
+        vector_store_type = env.get("VECTOR_STORE_TYPE", "chroma").lower()
+        storage_mode = env.get("STORAGE_MODE", "memory").lower()
+        chroma_persist_dir = env.get("CHROMA_PERSIST_DIR", "./chroma_db")
+        faiss_index_type = env.get("FAISS_INDEX_TYPE", "SQ8")
+        faiss_nprobe = int(env.get("FAISS_NPROBE", "8"))
+        faiss_ef_search = int(env.get("FAISS_EF_SEARCH", "64"))
+        faiss_binary_prefilter = env.get("FAISS_BINARY_PREFILTER", "false").lower() == "true"
+        faiss_binary_rescore_factor = int(env.get("FAISS_BINARY_RESCORE_FACTOR", "40"))
+        int8_min_items = int(env.get("INT8_MIN_ITEMS", "10000"))
+        hnsw_min_items = int(env.get("HNSW_MIN_ITEMS", "50000"))
+        embedding_backend = env.get("EMBEDDING_BACKEND", "auto").lower()
+        embed_batch_size = int(env.get("EMBED_BATCH_SIZE", "64"))
+        xml_validate_first_row = env.get("XML_VALIDATE_FIRST_ROW", "true").lower() == "true"
+        llm_type = env.get("LLM_TYPE", "gpt").lower()
+        port = int(env.get("PORT", "5000"))
+        num_threads = int(env.get("NUM_THREADS", "0"))
         
         config = cls(
             telegram_token=telegram_token,
+            reply_mode=ReplyMode(reply_mode),
             vector_store_type=VectorStoreType(vector_store_type),
             storage_mode=StorageMode(storage_mode),
             chroma_persist_dir=chroma_persist_dir,
+            faiss_index_type=faiss_index_type,
+            faiss_nprobe=faiss_nprobe,
+            faiss_ef_search=faiss_ef_search,
+            faiss_binary_prefilter=faiss_binary_prefilter,
+            faiss_binary_rescore_factor=faiss_binary_rescore_factor,
+            int8_min_items=int8_min_items,
+            hnsw_min_items=hnsw_min_items,
+            embedding_backend=embedding_backend,
+            embedding_onnx_file=env.get("EMBEDDING_ONNX_FILE") or None,
+            embed_batch_size=embed_batch_size,
+            xml_validate_first_row=xml_validate_first_row,
             llm_type=LLMType(llm_type),
-            openai_api_key=os.getenv("OPENAI_API_KEY"),
-            anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
-            llama_model_path=os.getenv("LLAMA_MODEL_PATH"),
-            port=port
+            openai_api_key=env.get("OPENAI_API_KEY"),
+            anthropic_api_key=env.get("ANTHROPIC_API_KEY"),
+            llama_model_path=env.get("LLAMA_MODEL_PATH"),
+            port=port,
+            num_threads=num_threads
         )
         
-        # Ensure vector store directory exists with proper permissions if using disk storage
-        if config.storage_mode == StorageMode.DISK:
+        # Ensure vector store directory exists with proper permissions if using disk storage;
+        # an existing directory keeps whatever permissions it already has
+        if config.storage_mode == StorageMode.DISK and not os.path.isdir(config.chroma_persist_dir):
             os.makedirs(config.chroma_persist_dir, exist_ok=True)
             os.chmod(config.chroma_persist_dir, 0o755)  # rwxr-xr-x permissions
         
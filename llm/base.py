@@ -1,19 +1,35 @@
-from abc import ABC, abstractmethod
-from typing import List
-from models.property import PropertyMatch
+from typing import AsyncIterator, List
+from models.property import MD_TRANS, PropertyMatch
+
+# Per-property block of the LLM context, filled with str.format_map
+_PROP_TPL = (
+    "Property {i} (Match score: {score}%):\n"
+    "Name: {name}\n"
+    "Type: {type}\n"
+    "Location: {town}, {region}\n"
+    "Price: {price} {currency} ({price_freq})\n"
+    "Details: {beds} bedrooms, {baths} bathrooms\n"
+    "Area: {area}\n"
+    "Features: {features}\n"
+    "Description: {description}"
+)
+
+class LLMHandler:
+    def __init__(self):
+        # The system prompt never changes for a handler, so build it once
+        self._system_prompt = self._create_system_prompt()
 
-class LLMHandler(ABC):
-    @abstractmethod
     async def generate_response(self, query: str, matches: List[PropertyMatch]) -> str:
         """Generate response based on property matches"""
-        pass
+        raise NotImplementedError
+
+    async def stream_response(self, query: str, matches: List[PropertyMatch]) -> AsyncIterator[str]:
+        """Stream the response in text chunks; handlers without streaming yield it whole"""
+        yield await self.generate_response(query, matches)
 
     def _escape_markdown(self, text: str) -> str:
         """Escape special characters for Telegram MarkdownV2"""
-        special_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-        for char in special_chars:
-            text = text.replace(char, f'\\{char}')
-        return text
+        return text.translate(MD_TRANS)
 
     def _create_system_prompt(self) -> str:
         return """You are a knowledgeable and helpful real estate assistant. 
@@ -24,38 +40,38 @@ class LLMHandler(ABC):
         Use ** for bold text."""
 
     def _create_property_context(self, matches: List[PropertyMatch]) -> str:
-        properties_text = []
-        
-        for i, match in enumerate(matches, 1):
-            prop = match.property
-            similarity_percentage = round(match.similarity * 100, 1)
-            
-            # Get description text
-            description = ""
-            if isinstance(prop.desc, dict) and 'es' in prop.desc:
-                description = prop.desc['es'][:300] + "..."
-            elif isinstance(prop.desc, str):
-                description = prop.desc[:300] + "..."
-                
-            # Build area text
-            area_parts = []
-            if prop.surface_area_built:
-                area_parts.append(f"{prop.surface_area_built}m² built")
-            if prop.surface_area_plot:
-                area_parts.append(f"{prop.surface_area_plot}m² plot")
-            area_text = ", ".join(area_parts) if area_parts else "N/A"
-            
-            property_text = f"""
-Property {i} (Match score: {similarity_percentage}%):
-Name: {prop.property_name}
-Type: {prop.type}
-Location: {prop.town}, {prop.province or prop.country}
-Price: {prop.price} {prop.currency} ({prop.price_freq})
-Details: {prop.beds} bedrooms, {prop.baths} bathrooms
-Area: {area_text}
-Features: {', '.join(prop.features) if prop.features else 'None listed'}
-Description: {description}
-            """.strip()
-            properties_text.append(property_text)
-        
-        return "\n\n".join(properties_text)
\ No newline at end of file
+        return "\n\n".join(
+            self._format_property(i, match) for i, match in enumerate(matches, 1)
+        )
+
+    def _format_property(self, i: int, match: PropertyMatch) -> str:
+        prop = match.property
+
+        # Get description text, truncating only when it is actually long
+        description = prop.description_text(default="")
+        if len(description) > 300:
+            description = description[:300] + "..."
+
+        # Build area text
+        area_parts = []
+        if prop.surface_area_built:
+            area_parts.append(f"{prop.surface_area_built}m² built")
+        if prop.surface_area_plot:
+            area_parts.append(f"{prop.surface_area_plot}m² plot")
+
+        return _PROP_TPL.format_map({
+            "i": i,
+            "score": round(match.similarity * 100, 1),
+            "name": prop.property_name,
+            "type": prop.type,
+            "town": prop.town,
+            "region": prop.province or prop.country,
+            "price": prop.price,
+            "currency": prop.currency,
+            "price_freq": prop.price_freq,
+            "beds": prop.beds,
+            "baths": prop.baths,
+            "area": ", ".join(area_parts) if area_parts else "N/A",
+            "features": ', '.join(prop.features) if prop.features else 'None listed',
+            "description": description,
+        })
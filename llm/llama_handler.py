@@ -1,36 +1,68 @@
-from typing import List
-from langchain_community.llms import LlamaCpp
-from langchain_core.messages import HumanMessage
-from langchain_core.messages import SystemMessage
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List
 from models.property import PropertyMatch
+from utils.cpu import compute_threads
 from .base import LLMHandler
 
+# llama.cpp inference is synchronous and the model is not safe to share between threads,
+# so every call runs on one dedicated worker and concurrent queries simply queue up
+_LLAMA_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llama")
+
 class LlamaHandler(LLMHandler):
     def __init__(self, model_path: str):
+        super().__init__()
+        from langchain_community.llms import LlamaCpp
         self.llm = LlamaCpp(
             model_path=model_path,
             temperature=0.7,
             max_tokens=2000,
             top_p=1,
             n_ctx=2048,
+            # Same physical-core count as FAISS; SMT siblings only slow the matmul kernels down
+            n_threads=compute_threads(),
+            n_gpu_layers=-1,  # offload every layer when llama.cpp is built with GPU support
+            n_batch=512,
             verbose=False
         )
+        # Llama expects a specific format; the system block is the same for every prompt
+        self._prompt_prefix = f"<s>[INST] <<SYS>>\n{self._system_prompt}\n<</SYS>>\n\n"
 
-    async def generate_response(self, query: str, matches: List[PropertyMatch]) -> str:
-        system_prompt = self._create_system_prompt()
+    def _build_prompt(self, query: str, matches: List[PropertyMatch]) -> str:
         property_context = self._create_property_context(matches)
 
-        # Llama expects a specific format
-        prompt = f"""<s>[INST] <<SYS>>
-{system_prompt}
-<</SYS>>
-
-User Query: {query}
+        prompt = self._prompt_prefix + f"""User Query: {query}
 
 Available properties:
 {property_context}
 
 Please analyze these properties and suggest the best matches for the user's requirements.[/INST]"""
+        return prompt
 
-        response = await self.llm.ainvoke(prompt)
+    async def generate_response(self, query: str, matches: List[PropertyMatch]) -> str:
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(_LLAMA_EXECUTOR, self.llm.invoke, self._build_prompt(query, matches))
         return response
+
+    async def stream_response(self, query: str, matches: List[PropertyMatch]) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def produce(prompt: str) -> None:
+            # Runs on the llama worker; hand each chunk back to the event loop as it arrives
+            try:
+                for chunk in self.llm.stream(prompt):
+                    loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+            finally:
+                loop.call_soon_threadsafe(chunks.put_nowait, done)
+
+        future = loop.run_in_executor(_LLAMA_EXECUTOR, produce, self._build_prompt(query, matches))
+        while True:
+            chunk = await chunks.get()
+            if chunk is done:
+                break
+            if chunk:
+                yield chunk
+        # Surface any error raised during generation
+        await future
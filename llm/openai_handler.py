@@ -1,5 +1,4 @@
-from typing import List
-from langchain_openai import ChatOpenAI
+from typing import AsyncIterator, List
 from langchain_core.messages import HumanMessage
 from langchain_core.messages import SystemMessage
 from models.property import PropertyMatch
@@ -7,18 +6,21 @@ from .base import LLMHandler
 
 class OpenAIHandler(LLMHandler):
     def __init__(self, api_key: str, model: str = "gpt-3.5-turbo"):
+        super().__init__()
+        from langchain_openai import ChatOpenAI
         self.llm = ChatOpenAI(
             api_key=api_key,
             model=model,
             temperature=0.7
         )
+        # Messages are immutable, so every request can share the same system message
+        self._system_message = SystemMessage(content=self._system_prompt)
 
-    async def generate_response(self, query: str, matches: List[PropertyMatch]) -> str:
-        system_prompt = self._create_system_prompt()
+    def _build_messages(self, query: str, matches: List[PropertyMatch]) -> list:
         property_context = self._create_property_context(matches)
 
         messages = [
-            SystemMessage(content=system_prompt),
+            self._system_message,
             HumanMessage(content=f"""
 User Query: {query}
 
@@ -28,6 +30,13 @@ Available properties:
 Please analyze these properties and suggest the best matches for the user's requirements.
             """.strip())
         ]
+        return messages
 
-        response = await self.llm.ainvoke(messages)
+    async def generate_response(self, query: str, matches: List[PropertyMatch]) -> str:
+        response = await self.llm.ainvoke(self._build_messages(query, matches))
         return response.content
+
+    async def stream_response(self, query: str, matches: List[PropertyMatch]) -> AsyncIterator[str]:
+        async for chunk in self.llm.astream(self._build_messages(query, matches)):
+            if chunk.content:
+                yield chunk.content
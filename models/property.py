@@ -1,7 +1,13 @@
-from typing import Optional, List, Dict
-from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, NamedTuple
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+# Telegram MarkdownV2 escape table, applied in a single pass by str.translate; shared with llm.base
+MD_TRANS = str.maketrans({c: '\\' + c for c in ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']})
 
 class Property(BaseModel):
+    # Schema is built on first use rather than at import; instances are read-only after load
+    model_config = ConfigDict(defer_build=True, frozen=True, extra='ignore')
+
     id: str
     date: str
     ref: str
@@ -22,16 +28,26 @@ class Property(BaseModel):
     pool: bool = False
     property_name: str
     images: List[Dict[str, str]] = Field(default_factory=list)
+
+    # Formatted text derived from the fields above, which are not changed after load
+    _text_cache: Dict[str, str] = PrivateAttr(default_factory=dict)
     
     def _escape_markdown(self, text: str) -> str:
         """Escape special characters for Telegram MarkdownV2"""
-        special_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-        for char in special_chars:
-            text = text.replace(char, f'\\{char}')
-        return text
+        return text.translate(MD_TRANS)
+
+    def description_text(self, default: str = "Description not available") -> str:
+        """Spanish description text, or the default when the listing has none"""
+        return self.desc.get('es') or default
 
     def to_embedding_text(self) -> str:
         """Convert property to text for embedding"""
+        text = self._text_cache.get('embedding')
+        if text is None:
+            text = self._text_cache['embedding'] = self._format_embedding_text()
+        return text
+
+    def _format_embedding_text(self) -> str:
         features_text = ", ".join(self.features) if self.features else "No special features"
         description = self.desc.get('es', '') if self.desc else ''
         
@@ -57,6 +73,12 @@ class Property(BaseModel):
     
     def to_display_text(self) -> str:
         """Convert property to display format with markdown"""
+        text = self._text_cache.get('display')
+        if text is None:
+            text = self._text_cache['display'] = self._format_display_text()
+        return text
+
+    def _format_display_text(self) -> str:
         # Build area text
         area_parts = []
         if self.surface_area_built:
@@ -73,7 +95,7 @@ class Property(BaseModel):
         town = self._escape_markdown(str(self.town))
         province = self._escape_markdown(str(self.province)) if self.province else ''
         country = self._escape_markdown(str(self.country))
-        features = [self._escape_markdown(f) for f in self.features]
+        features = [f.translate(MD_TRANS) for f in self.features]
         ref = self._escape_markdown(str(self.ref))
         area_text = self._escape_markdown(area_text)
         
@@ -89,6 +111,7 @@ class Property(BaseModel):
 *🔍 Reference:* {ref}
         """.strip()
 
-class PropertyMatch(BaseModel):
+class PropertyMatch(NamedTuple):
+    # Built once per search hit from an already-loaded Property; a tuple is the cheapest to build
     property: Property
     similarity: float
\ No newline at end of file
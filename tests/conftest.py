@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Modules import each other from the repository root, as app.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# config.py builds the process-wide Config at import and requires a bot token
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+pytest.importorskip("langchain_community")
+pytest.importorskip("langchain_huggingface")
+
+from vectorstore.faiss_store import BINARY_PREFILTER_MIN_ITEMS, BINARY_RESCORE_FACTOR, FAISSPropertyStore
+
+N_ITEMS = 20000
+N_CLUSTERS = 200
+N_QUERIES = 200
+DIMENSION = 384
+TOP_K = 5
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+@pytest.mark.parametrize("noise", [0.3, 0.6])
+def test_binary_prefilter_recall_matches_exact_search(noise):
+    """Recall@5 of the sign-bit prefilter against an exact inner-product scan"""
+    assert N_ITEMS >= BINARY_PREFILTER_MIN_ITEMS
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((N_CLUSTERS, DIMENSION))
+    vectors = _normalized(centers[rng.integers(0, N_CLUSTERS, N_ITEMS)]
+                          + noise * rng.standard_normal((N_ITEMS, DIMENSION)))
+    # Queries are fresh points from the same clusters, so their neighbours are cluster members
+    queries = _normalized(centers[rng.integers(0, N_CLUSTERS, N_QUERIES)]
+                          + noise * rng.standard_normal((N_QUERIES, DIMENSION)))
+
+    index = faiss.IndexFlatIP(DIMENSION)
+    index.add(vectors)
+    _, exact = index.search(queries, TOP_K)
+
+    binary_index = FAISSPropertyStore._build_binary_index(np.packbits(vectors > 0, axis=1), index)
+    hits = 0
+    for query, truth in zip(queries, exact):
+        rows, _ = FAISSPropertyStore.binary_prefilter_search(
+            binary_index, index, query[None, :], TOP_K, BINARY_RESCORE_FACTOR
+        )
+        hits += len(set(rows.tolist()) & set(truth.tolist()))
+    assert hits / exact.size >= 0.9
+
+@pytest.mark.parametrize("index_type, exhaustive", [
+    ("Flat", True),
+    ("SQ8", True),
+    ("HNSW32", False),
+    ("IVF16,Flat", False),
+])
+def test_binary_prefilter_only_replaces_exhaustive_scans(index_type, exhaustive):
+    index = faiss.index_factory(64, index_type, faiss.METRIC_INNER_PRODUCT)
+    assert FAISSPropertyStore._is_exhaustive(index) is exhaustive
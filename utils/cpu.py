@@ -0,0 +1,45 @@
+import os
+import math
+from typing import Optional
+from config import Config
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _cgroup_cpu_limit() -> Optional[int]:
+    """CPUs worth of time a cgroup quota allows this process, or None when unlimited"""
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    cpu_max = _read("/sys/fs/cgroup/cpu.max")
+    try:
+        if cpu_max:
+            quota, period = cpu_max.split()[:2]
+            return None if quota == "max" else max(1, math.ceil(int(quota) / int(period)))
+        # cgroup v1
+        quota = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+        period = _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+        if quota and period and int(quota) > 0:
+            return max(1, math.ceil(int(quota) / int(period)))
+    except ValueError:
+        pass
+    return None
+
+def compute_threads() -> int:
+    """Threads for compute-bound native code (FAISS OpenMP, llama.cpp): one per usable physical core"""
+    configured = Config.load().num_threads
+    if configured > 0:
+        return configured
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS or Windows
+        cpus = os.cpu_count() or 1
+    # Hyper-threads share SIMD units, so only count one per core when SMT is on
+    if _read("/sys/devices/system/cpu/smt/active") == "1" and cpus > 1:
+        cpus //= 2
+    quota = _cgroup_cpu_limit()
+    if quota is not None:
+        cpus = min(cpus, quota)
+    return max(1, cpus)
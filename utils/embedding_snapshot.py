@@ -0,0 +1,192 @@
+import os
+import json
+import hashlib
+import tempfile
+from uuid import uuid4
+from typing import BinaryIO, Callable, Dict, List, Optional
+import numpy as np
+from models.property import Property
+
+EMBEDDINGS_FILE = "embeddings.npy"
+IDS_FILE = "ids.json"
+# Search structures derived from a snapshot (int8 codes, HNSW graph) and the snapshot they belong to
+INDEX_CACHE_FILE = "index_cache.json"
+
+def xml_fingerprint(xml_path: str) -> str:
+    """Fingerprint the XML feed by modification time and content hash"""
+    sha256 = hashlib.sha256()
+    with open(xml_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha256.update(chunk)
+    return f"{os.path.getmtime(xml_path)}:{sha256.hexdigest()}"
+
+def text_hash(text: str) -> str:
+    """Content key of one embedding text"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+def _snapshot_paths(xml_path: str):
+    folder = os.path.dirname(os.path.abspath(xml_path))
+    return os.path.join(folder, EMBEDDINGS_FILE), os.path.join(folder, IDS_FILE)
+
+def _file_identity(path: str) -> Dict[str, int]:
+    """Identity of the array file the manifest was written for; a rewrite changes the inode"""
+    st = os.stat(path)
+    return {'inode': st.st_ino, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+def _replace_file(path: str, write: Callable[[BinaryIO], None]) -> None:
+    """Write a temporary file next to path, then rename it over path
+
+    The rename gives the file a new inode, so a process that has the old snapshot
+    memory-mapped keeps reading the old pages instead of a truncated file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _replace_path(path: str, write_path: Callable[[str], None]) -> None:
+    """Like _replace_file, for writers that take a file name (e.g. hnswlib's save_index)"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write_path(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def snapshot_key(xml_path: str) -> Optional[str]:
+    """Id of the saved snapshot next to the XML feed, or None if it is missing or torn"""
+    embeddings_path, ids_path = _snapshot_paths(xml_path)
+    manifest = _read_json(ids_path)
+    try:
+        if manifest.get('array') != _file_identity(embeddings_path):
+            return None
+    except OSError:
+        return None
+    return manifest.get('snapshot_id')
+
+def load_index_part(folder: str, key: str, name: str) -> Optional[str]:
+    """Path of a structure derived from snapshot `key`, or None if missing or built from another snapshot"""
+    entry = _read_json(os.path.join(folder, INDEX_CACHE_FILE))
+    path = os.path.join(folder, name)
+    recorded = entry.get('parts', {}).get(name) if entry.get('snapshot_id') == key else None
+    try:
+        return path if recorded and recorded == _file_identity(path) else None
+    except OSError:
+        return None
+
+def save_index_part(folder: str, key: str, name: str, write_path: Callable[[str], None]) -> None:
+    """Save a structure derived from snapshot `key` and record it, so the next start can load it"""
+    cache_path = os.path.join(folder, INDEX_CACHE_FILE)
+    try:
+        path = os.path.join(folder, name)
+        _replace_path(path, write_path)
+        entry = _read_json(cache_path)
+        if entry.get('snapshot_id') != key:
+            entry = {'snapshot_id': key, 'parts': {}}
+        entry['parts'][name] = _file_identity(path)
+        _replace_file(cache_path, lambda f: f.write(json.dumps(entry).encode('utf-8')))
+    except OSError as e:
+        print(f"Could not save {name} for the embedding snapshot: {str(e)}")
+
+def load_embeddings(xml_path: str, properties: List[Property], model_name: str, mmap: bool = False) -> Optional[np.ndarray]:
+    """Return embeddings saved for this exact XML feed and model, or None if stale or missing"""
+    embeddings_path, ids_path = _snapshot_paths(xml_path)
+    if not (os.path.exists(embeddings_path) and os.path.exists(ids_path)):
+        return None
+
+    try:
+        with open(ids_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('fingerprint') != xml_fingerprint(xml_path) or manifest.get('model') != model_name:
+            return None
+        # An array from an interrupted save would otherwise be read against the older manifest
+        if manifest.get('array') != _file_identity(embeddings_path):
+            return None
+        # Rows must line up with the properties we just parsed
+        if manifest.get('ids') != [str(prop.id) for prop in properties]:
+            return None
+
+        # A memory map lets the OS page cache serve the vectors instead of a private copy
+        embeddings = np.load(embeddings_path, mmap_mode='r' if mmap else None)
+        if embeddings.shape[0] != len(properties):
+            return None
+        return embeddings.astype(np.float32, copy=False)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable embedding snapshot: {str(e)}")
+        return None
+
+def load_embedding_cache(xml_path: str, properties: List[Property], model_name: str) -> Dict[str, np.ndarray]:
+    """Map embedding text -> saved vector for properties whose text is unchanged since the last snapshot"""
+    embeddings_path, ids_path = _snapshot_paths(xml_path)
+    if not (os.path.exists(embeddings_path) and os.path.exists(ids_path)):
+        return {}
+
+    try:
+        with open(ids_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        hashes = manifest.get('hashes')
+        if manifest.get('model') != model_name or not hashes:
+            return {}
+        if manifest.get('array') != _file_identity(embeddings_path) or len(manifest.get('ids', ())) != len(hashes):
+            return {}
+
+        rows = {h: i for i, h in enumerate(hashes)}
+        hits = {}
+        for prop in properties:
+            text = prop.to_embedding_text()
+            row = rows.get(text_hash(text))
+            if row is not None:
+                hits[text] = row
+        if not hits:
+            return {}
+
+        # Only the matching rows are read from the mapped file
+        embeddings = np.load(embeddings_path, mmap_mode='r')
+        if embeddings.shape[0] != len(hashes):
+            return {}
+        return {text: np.array(embeddings[row], dtype=np.float32) for text, row in hits.items()}
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable embedding snapshot: {str(e)}")
+        return {}
+
+def save_embeddings(xml_path: str, properties: List[Property], model_name: str, embeddings: np.ndarray) -> Optional[str]:
+    """Save embeddings next to the XML feed so later starts can skip the encoder; returns the snapshot id"""
+    embeddings_path, ids_path = _snapshot_paths(xml_path)
+    try:
+        _replace_file(embeddings_path, lambda f: np.save(f, embeddings.astype(np.float32, copy=False)))
+        manifest = {
+            'fingerprint': xml_fingerprint(xml_path),
+            'model': model_name,
+            'ids': [str(prop.id) for prop in properties],
+            'hashes': [text_hash(prop.to_embedding_text()) for prop in properties],
+            'array': _file_identity(embeddings_path),
+            # Keys the search structures derived from this snapshot
+            'snapshot_id': uuid4().hex
+        }
+        # The manifest goes last: until it is replaced, the old one no longer matches the new array
+        _replace_file(ids_path, lambda f: f.write(json.dumps(manifest).encode('utf-8')))
+        return manifest['snapshot_id']
+    except OSError as e:
+        print(f"Could not save embedding snapshot: {str(e)}")
+        return None
@@ -1,90 +1,144 @@
-from typing import List
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List
 import xml.etree.ElementTree as ET
+from config import Config
 from models.property import Property
 
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # lxml is faster, but the stdlib parser streams just as well
+    lxml_etree = None
+
 def clean_numeric(value: str) -> float:
     """Convert string numbers to float, handling commas"""
     if value is None:
         return 0.0
+    # Feeds repeat the same prices and areas a lot, so memoize the string form
+    return _parse_numeric(str(value))
+
+@lru_cache(maxsize=4096)
+def _parse_numeric(value: str) -> float:
     try:
         # Replace comma with dot and convert to float
-        return float(str(value).replace(',', '.'))
-    except (ValueError, AttributeError):
+        return float(value.replace(',', '.'))
+    except ValueError:
         return 0.0
 
-def load_properties_from_xml(file_path: str) -> List[Property]:
-    """Load and parse properties from XML file"""
-    tree = ET.parse(file_path)
-    root = tree.getroot()
-    properties = []
-    
-    for prop_elem in root.findall('.//property'):
+def _property_fields(prop_elem) -> Dict[str, Any]:
+    """Extract already-coerced Property field values from a single <property> element"""
+    # Index the children in one pass instead of a linear find() per field
+    kids = {child.tag: child for child in prop_elem}
+
+    def txt(tag: str, default: str = '') -> str:
+        elem = kids.get(tag)
+        return elem.text.strip() if elem is not None and elem.text else default
+
+    # Extract surface area
+    surface_area_elem = kids.get('surface_area')
+    surface_built = surface_plot = 0.0
+    if surface_area_elem is not None:
+        area_kids = {child.tag: child for child in surface_area_elem}
+        built_elem = area_kids.get('built')
+        plot_elem = area_kids.get('plot')
+        if built_elem is not None and built_elem.text:
+            surface_built = clean_numeric(built_elem.text)
+        if plot_elem is not None and plot_elem.text:
+            surface_plot = clean_numeric(plot_elem.text)
+
+    # Extract features
+    features_elem = kids.get('features')
+    feature_list = []
+    if features_elem is not None:
+        for feature in features_elem:
+            if feature.tag == 'feature' and feature.text:
+                feature_list.append(feature.text.strip())
+
+    # Extract description
+    desc = {'es': ''}  # Default empty Spanish description
+    desc_elem = kids.get('desc')
+    if desc_elem is not None:
+        es_elem = desc_elem.find('es')
+        if es_elem is not None and es_elem.text:
+            desc['es'] = es_elem.text.strip()
+
+    # Extract images
+    images = []
+    images_elem = kids.get('images')
+    if images_elem is not None:
+        for img in images_elem:
+            if img.tag != 'image':
+                continue
+            url_elem = img.find('url')
+            if url_elem is not None and url_elem.text:
+                if url_elem.text.startswith('http'):
+                    images.append({'url': url_elem.text})
+
+    new_build = txt('new_build')
+    beds = txt('beds')
+    baths = txt('baths')
+    pool = txt('pool')
+
+    # Every field is set explicitly since model_construct does not apply defaults
+    return dict(
+        id=txt('id'),
+        date=txt('date'),
+        ref=txt('ref'),
+        price=clean_numeric(txt('price') or None),
+        currency=txt('currency'),
+        price_freq=txt('price_freq'),
+        new_build=bool(int(new_build)) if new_build else False,
+        type=txt('type'),
+        town=txt('town'),
+        province=txt('province') or None,
+        country=txt('country'),
+        beds=int(beds) if beds else None,
+        baths=int(baths) if baths else None,
+        surface_area_built=surface_built,
+        surface_area_plot=surface_plot,
+        desc=desc,
+        features=feature_list,
+        pool=bool(int(pool)) if pool else False,
+        property_name=txt('property_name'),
+        images=images
+    )
+
+def _iter_property_elements(file_path: str) -> Iterator[Any]:
+    """Yield each <property> element as soon as it is parsed, then release it"""
+    if lxml_etree is not None:
+        for _, prop_elem in lxml_etree.iterparse(file_path, tag='property'):
+            yield prop_elem
+            # Drop the parsed element and any already-processed siblings
+            prop_elem.clear()
+            while prop_elem.getprevious() is not None:
+                del prop_elem.getparent()[0]
+        return
+
+    context = ET.iterparse(file_path, events=('start', 'end'))
+    _, root = next(context)
+    for event, elem in context:
+        if event == 'end' and elem.tag == 'property':
+            yield elem
+            # Processed properties are no longer needed; keep the tree O(1)
+            root.clear()
+
+def iter_properties_from_xml(file_path: str) -> Iterator[Property]:
+    """Stream properties from an XML file, releasing each element once parsed"""
+    # Properties are built with model_construct (no validation) since the loader already
+    # coerces every field; XML_VALIDATE_FIRST_ROW=false also skips validating the first row
+    validate_first = Config.load().xml_validate_first_row
+    for prop_elem in _iter_property_elements(file_path):
         try:
-            # Extract surface area
-            surface_area_elem = prop_elem.find('surface_area')
-            surface_built = surface_plot = 0.0
-            if surface_area_elem is not None:
-                built_elem = surface_area_elem.find('built')
-                plot_elem = surface_area_elem.find('plot')
-                if built_elem is not None and built_elem.text:
-                    surface_built = clean_numeric(built_elem.text)
-                if plot_elem is not None and plot_elem.text:
-                    surface_plot = clean_numeric(plot_elem.text)
-            
-            # Extract features
-            features_elem = prop_elem.find('features')
-            feature_list = []
-            if features_elem is not None:
-                for feature in features_elem.findall('feature'):
-                    if feature is not None and feature.text:
-                        feature_list.append(feature.text.strip())
-            
-            # Extract description
-            desc = {'es': ''}  # Default empty Spanish description
-            desc_elem = prop_elem.find('desc')
-            if desc_elem is not None:
-                es_elem = desc_elem.find('es')
-                if es_elem is not None and es_elem.text:
-                    desc['es'] = es_elem.text.strip()
-            
-            # Extract images
-            images = []
-            images_elem = prop_elem.find('images')
-            if images_elem is not None:
-                for img in images_elem.findall('image'):
-                    url_elem = img.find('url')
-                    if url_elem is not None and url_elem.text:
-                        if url_elem.text.startswith('http'):
-                            images.append({'url': url_elem.text})
-            
-            # Create property object
-            property_data = Property(
-                id=prop_elem.find('id').text.strip() if prop_elem.find('id') is not None else '',
-                date=prop_elem.find('date').text.strip() if prop_elem.find('date') is not None else '',
-                ref=prop_elem.find('ref').text.strip() if prop_elem.find('ref') is not None else '',
-                price=clean_numeric(prop_elem.find('price').text) if prop_elem.find('price') is not None else 0.0,
-                currency=prop_elem.find('currency').text.strip() if prop_elem.find('currency') is not None else '',
-                price_freq=prop_elem.find('price_freq').text.strip() if prop_elem.find('price_freq') is not None else '',
-                new_build=bool(int(prop_elem.find('new_build').text)) if prop_elem.find('new_build') is not None else False,
-                type=prop_elem.find('type').text.strip() if prop_elem.find('type') is not None else '',
-                town=prop_elem.find('town').text.strip() if prop_elem.find('town') is not None else '',
-                province=prop_elem.find('province').text.strip() if prop_elem.find('province') is not None else None,
-                country=prop_elem.find('country').text.strip() if prop_elem.find('country') is not None else '',
-                beds=int(prop_elem.find('beds').text) if prop_elem.find('beds') is not None else None,
-                baths=int(prop_elem.find('baths').text) if prop_elem.find('baths') is not None else None,
-                surface_area_built=surface_built,
-                surface_area_plot=surface_plot,
-                desc=desc,
-                features=feature_list,
-                pool=bool(int(prop_elem.find('pool').text)) if prop_elem.find('pool') is not None else False,
-                property_name=prop_elem.find('property_name').text.strip() if prop_elem.find('property_name') is not None else '',
-                images=images
-            )
-            
-            properties.append(property_data)
-            
+            fields = _property_fields(prop_elem)
+            if validate_first:
+                # Sanity-check the loader's coercion once against the real model
+                validate_first = False
+                yield Property.model_validate(fields)
+            else:
+                yield Property.model_construct(**fields)
         except Exception as e:
-            print(f"Error processing property {prop_elem.find('id').text if prop_elem.find('id') is not None else 'unknown'}: {str(e)}")
-            continue
-    
-    return properties
\ No newline at end of file
+            prop_id = prop_elem.findtext('id') or 'unknown'
+            print(f"Error processing property {prop_id}: {str(e)}")
+
+def load_properties_from_xml(file_path: str) -> List[Property]:
+    """Load and parse properties from XML file"""
+    return list(iter_properties_from_xml(file_path))
@@ -1,50 +1,585 @@
-from abc import ABC, abstractmethod
-from typing import List, Optional
+import os
+import queue
+import platform
+import threading
+import importlib.util
+from collections import OrderedDict
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.vectorstores import VectorStore
 from langchain_core.documents import Document
+from config import Config
 from models.property import Property, PropertyMatch
+from utils.embedding_snapshot import load_index_part, save_index_part
 
-class PropertyVectorStore(ABC):
+try:
+    import simsimd
+except ImportError:  # optional: NumPy's BLAS matrix-vector product is used instead
+    simsimd = None
+
+try:
+    import hnswlib
+except ImportError:  # optional: large catalogs are then scanned exactly like small ones
+    hnswlib = None
+
+try:
+    from numba import njit
+except ImportError:  # optional: the scan then runs as a NumPy matrix-vector product
+    njit = None
+
+if njit is not None:
+    # No fastmath: it lets LLVM assume finite values, which would break comparisons against the sentinel
+    @njit(cache=True)
+    def _fused_topk(matrix, query, k):
+        """Dot product of every row with the query and a sorted top-k, in one native pass"""
+        n, d = matrix.shape
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top_scores = np.full(k, -np.finfo(np.float32).max, dtype=np.float32)
+        top_idx = np.full(k, -1, dtype=np.int64)
+        for i in range(n):
+            score = np.float32(0.0)
+            for j in range(d):
+                score += matrix[i, j] * query[j]
+            if score > top_scores[k - 1]:
+                # k is tiny, so insertion into the sorted buffer beats a heap
+                pos = k - 1
+                while pos > 0 and top_scores[pos - 1] < score:
+                    top_scores[pos] = top_scores[pos - 1]
+                    top_idx[pos] = top_idx[pos - 1]
+                    pos -= 1
+                top_scores[pos] = score
+                top_idx[pos] = i
+        return top_idx, top_scores
+else:
+    _fused_topk = None
+
+# Tokenized batches the CPU may prepare ahead of the GPU during bulk encoding
+PIPELINE_PREFETCH = 4
+# On multi-GPU hosts, bulk encodes this large are sharded with one worker process per GPU
+MULTI_GPU_MIN_TEXTS = 5000
+# With simsimd, catalogs of Config.int8_min_items or more are scanned as int8 codes and the
+# top hits re-scored in float32; from Config.hnsw_min_items they also get an HNSW graph
+INT8_OVERSAMPLE = 4
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+# Saved next to the embedding snapshot they were built from
+I8_CACHE_FILE = "embeddings_i8.npy"
+HNSW_CACHE_FILE = f"embeddings_hnsw_M{HNSW_M}_ef{HNSW_EF_CONSTRUCTION}.bin"
+# Recently embedded search queries kept per store, keyed by normalized text
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
+# Config.embedding_backend: "auto" runs an INT8-quantized ONNX export on CPU when one matches
+# the host and optimum[onnxruntime] is installed, "onnx" always uses ONNX and "torch" always
+# runs the regular FP32 PyTorch model; "static" uses a Model2Vec distillation of the model,
+# far faster on CPU at some recall cost
+# Quantized exports published alongside sentence-transformers models, per instruction set
+ONNX_QUANTIZED_FILES = {
+    "arm64": "onnx/model_qint8_arm64.onnx",
+    "avx512_vnni": "onnx/model_qint8_avx512_vnni.onnx",
+    "avx512": "onnx/model_qint8_avx512.onnx",
+    "avx2": "onnx/model_quint8_avx2.onnx",
+}
+# Unquantized export, for an explicit "onnx" backend on a host none of the above fits
+ONNX_DEFAULT_FILE = "onnx/model.onnx"
+# Distilled static models are built once and kept here
+STATIC_MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "static_models")
+STATIC_PCA_DIMS = 256
+
+@lru_cache(maxsize=1)
+def _embedding_device() -> str:
+    """Run the encoder on the GPU whenever one is available"""
+    # torch is always installed alongside sentence-transformers
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+@lru_cache(maxsize=1)
+def _cuda_device_count() -> int:
+    if _embedding_device() != "cuda":
+        return 0
+    import torch
+    return torch.cuda.device_count()
+
+@lru_cache(maxsize=1)
+def _host_isa() -> Optional[str]:
+    """The best instruction set a quantized ONNX export exists for on this CPU, or None"""
+    machine = platform.machine().lower()
+    if machine in ("arm64", "aarch64"):
+        return "arm64"
+    if machine not in ("x86_64", "amd64"):
+        return None
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            flags = set(next((line.split(":", 1)[1].split() for line in f if line.startswith("flags")), ()))
+    except OSError:  # not Linux; fall back to PyTorch rather than guess
+        return None
+    if "avx512_vnni" in flags:
+        return "avx512_vnni"
+    if {"avx512f", "avx512bw"} <= flags:
+        return "avx512"
+    if "avx2" in flags:
+        return "avx2"
+    return None
+
+def _onnx_file() -> Optional[str]:
+    """Configured ONNX export, else the quantized one matching this host"""
+    configured = Config.load().embedding_onnx_file
+    if configured:
+        return configured
+    isa = _host_isa()
+    return ONNX_QUANTIZED_FILES[isa] if isa else None
+
+def _static_model_path(model_name: str) -> str:
+    """Distill the model into static token embeddings on first use and return its folder"""
+    path = os.path.join(STATIC_MODELS_DIR, f"{model_name.replace('/', '__')}-pca{STATIC_PCA_DIMS}")
+    if not os.path.isdir(path):
+        # Needs the model2vec package; only runs once per model
+        from sentence_transformers import SentenceTransformer
+        from sentence_transformers.models import StaticEmbedding
+        source = model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+        print(f"Distilling static embeddings from {source}...")
+        static = StaticEmbedding.from_distillation(source, pca_dims=STATIC_PCA_DIMS, device=_embedding_device())
+        SentenceTransformer(modules=[static]).save(path)
+    return path
+
+def _use_onnx_backend() -> bool:
+    """Whether to load the quantized ONNX export instead of the PyTorch weights"""
+    backend = Config.load().embedding_backend
+    if backend == "static":
+        return False
+    if backend in ("torch", "onnx"):
+        return backend == "onnx"
+    # INT8 kernels only pay off on CPU; a GPU runs the PyTorch model in FP16 instead
+    if _embedding_device() == "cuda" or _onnx_file() is None:
+        return False
+    return all(importlib.util.find_spec(name) is not None for name in ("optimum", "onnxruntime"))
+
+@lru_cache(maxsize=4)
+def _get_embedder(model_name: str) -> HuggingFaceEmbeddings:
+    """Load each embedding model once per process and share it between stores"""
+    # Sharing is safe: SentenceTransformer.encode is thread-safe for inference
+    encode_kwargs = {"batch_size": Config.load().embed_batch_size, "normalize_embeddings": True}
+    backend = Config.load().embedding_backend
+    if backend == "static":
+        # Token lookups plus mean pooling; there is no transformer left to put on a GPU
+        return HuggingFaceEmbeddings(
+            model_name=_static_model_path(model_name),
+            model_kwargs={"device": "cpu"},
+            encode_kwargs=encode_kwargs
+        )
+    if _use_onnx_backend():
+        try:
+            return HuggingFaceEmbeddings(
+                model_name=model_name,
+                model_kwargs={
+                    "device": "cpu",
+                    "backend": "onnx",
+                    "model_kwargs": {"file_name": _onnx_file() or ONNX_DEFAULT_FILE}
+                },
+                encode_kwargs=encode_kwargs
+            )
+        except Exception as e:
+            if backend == "onnx":
+                raise
+            print(f"Quantized ONNX model unavailable for {model_name}, using PyTorch: {str(e)}")
+
+    return HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs={"device": _embedding_device()},
+        encode_kwargs=encode_kwargs
+    )
+
+def _encode_context():
+    """Mixed precision on CUDA; FP16 halves activation traffic with no effect on ranking"""
+    if _embedding_device() != "cuda":
+        return nullcontext()
+    import torch
+    return torch.autocast(device_type="cuda", dtype=torch.float16)
+
+class PropertyVectorStore:
     def __init__(self, embedding_model_name: str = "all-MiniLM-L6-v2"):
-        self.embeddings = HuggingFaceEmbeddings(model_name=embedding_model_name)
+        self.embedding_model_name = embedding_model_name
+        self.embeddings = _get_embedder(embedding_model_name)
         self.vector_store: Optional[VectorStore] = None
         self.properties: dict[str, Property] = {}
+        # Row-aligned, L2-normalized embedding matrix for exact in-process search
+        self._matrix: Optional[np.ndarray] = None
+        self._props_list: List[Property] = []
+        self._hnsw = None
+        self._matrix_i8: Optional[np.ndarray] = None
+        # (folder, snapshot id) under which the int8 codes and HNSW graph are saved and reloaded
+        self._index_cache: Optional[Tuple[str, str]] = None
+        # LRU of query text -> embedding so repeated queries skip the encoder
+        self._query_embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def attach_properties(self, properties: List[Property], embeddings: Optional[np.ndarray] = None) -> None:
+        """Register the properties behind an already populated store without re-embedding"""
+        self.properties = {str(prop.id): prop for prop in properties}
+        # Saved embeddings let searches use the in-process matrix straight away
+        if embeddings is not None:
+            self._build_matrix(embeddings, properties)
+
+    def use_index_cache(self, folder: str, key: Optional[str]) -> None:
+        """Save and reuse the search structures built over the embedding snapshot `key` in folder"""
+        self._index_cache = (folder, key) if key else None
+
+    @property
+    def embedding_model_id(self) -> str:
+        """Model name plus backend, so vectors from different encoders are never mixed"""
+        if Config.load().embedding_backend == "static":
+            return f"{self.embedding_model_name}:static{STATIC_PCA_DIMS}"
+        model_kwargs = self.embeddings.model_kwargs or {}
+        backend = model_kwargs.get("backend", "torch")
+        if backend == "onnx":
+            # Exports quantized for different instruction sets give slightly different vectors
+            onnx_file = model_kwargs.get("model_kwargs", {}).get("file_name", ONNX_DEFAULT_FILE)
+            return f"{self.embedding_model_name}:onnx:{os.path.basename(onnx_file)}"
+        return f"{self.embedding_model_name}:{backend}"
 
-    @abstractmethod
     def needs_loading(self) -> bool:
         """Check if the store needs to be loaded with data"""
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
-    def load_properties(self, properties: List[Property]) -> None:
-        """Load properties into the vector store"""
-        pass
+    def load_precomputed(self, embeddings: np.ndarray, properties: List[Property]) -> None:
+        """Load properties with embeddings already computed (one row per property)"""
+        raise NotImplementedError
+
+    def load_properties(self, properties: List[Property], batch_size: Optional[int] = None) -> None:
+        """Embed properties and load them into the vector store"""
+        if not properties:
+            raise ValueError("No properties provided to load")
+        self.load_precomputed(self.embed_properties(properties, batch_size=batch_size), properties)
 
-    @abstractmethod
     def clear(self) -> None:
         """Clear the vector store"""
-        pass
+        raise NotImplementedError
+
+    def search_by_vector(self, embedding: np.ndarray, top_k: int = 5) -> List[PropertyMatch]:
+        """Search for properties closest to a precomputed query embedding"""
+        raise NotImplementedError
+
+    def _sentence_transformer(self):
+        """The SentenceTransformer model behind the LangChain embeddings wrapper"""
+        # Newer langchain-huggingface releases keep it in `_client` instead of `client`
+        return getattr(self.embeddings, '_client', None) or self.embeddings.client
+
+    def embed(self, query: str) -> np.ndarray:
+        """Embed a search query with the store's embedding model"""
+        return self.embed_queries([query])[0]
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed several search queries in a single forward pass, reusing cached ones"""
+        # The model is uncased, so case and whitespace do not change the embedding
+        keys = [" ".join(query.lower().split()) for query in queries]
+        cache = self._query_embeddings
+        missing = list(dict.fromkeys(key for key in keys if key not in cache))
+        if missing:
+            for key, embedding in zip(missing, self._embed_documents(missing)):
+                cache[key] = embedding
+        for key in keys:
+            cache.move_to_end(key)
+        rows = [cache[key] for key in keys]
+        while len(cache) > QUERY_EMBEDDING_CACHE_SIZE:
+            cache.popitem(last=False)
+        return np.vstack(rows)
+
+    def _embed_documents(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """Embed texts in batches and return a single float32 matrix"""
+        batch_size = batch_size or Config.load().embed_batch_size
+        # Encoding directly returns one ndarray (on GPU when available), skipping
+        # LangChain's conversion of every vector to a Python list and back
+        with _encode_context():
+            embeddings = self._sentence_transformer().encode(
+                texts,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+        return embeddings.astype(np.float32, copy=False)
+
+    def _embed_pipelined(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Bulk-encode on CUDA while a background thread tokenizes the following batches"""
+        import torch
+        import torch.nn.functional as F
+
+        model = self._sentence_transformer()
+        # Longest texts first, as encode() does, so each batch pads to similar lengths
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        batches: queue.Queue = queue.Queue(maxsize=PIPELINE_PREFETCH)
+        errors: List[BaseException] = []
+        # Set when the consumer stops, including on error, so the producer never blocks on a full queue
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce() -> None:
+            try:
+                for start in range(0, len(order), batch_size):
+                    features = model.tokenize([texts[i] for i in order[start:start + batch_size]])
+                    if not put({k: v.pin_memory() if torch.is_tensor(v) else v for k, v in features.items()}):
+                        return
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                put(None)
+
+        threading.Thread(target=produce, daemon=True).start()
+        outputs = []
+        try:
+            with torch.inference_mode(), _encode_context():
+                while True:
+                    features = batches.get()
+                    if features is None:
+                        break
+                    features = {k: v.to(model.device, non_blocking=True) if torch.is_tensor(v) else v
+                                for k, v in features.items()}
+                    embeddings = model(features)["sentence_embedding"]
+                    outputs.append(F.normalize(embeddings.float(), dim=1).cpu())
+        finally:
+            stop.set()
+        if errors:
+            raise errors[0]
+
+        sorted_embeddings = torch.cat(outputs).numpy()
+        result = np.empty_like(sorted_embeddings)
+        result[order] = sorted_embeddings
+        return result
+
+    def _embed_multi_gpu(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Shard a bulk encode across every visible GPU, one worker process each"""
+        model = self._sentence_transformer()
+        # Each worker loads its own copy of the model, so this only pays off for large loads
+        pool = model.start_multi_process_pool(target_devices=[f"cuda:{i}" for i in range(_cuda_device_count())])
+        try:
+            embeddings = model.encode_multi_process(
+                texts, pool, batch_size=batch_size, normalize_embeddings=True
+            )
+        finally:
+            model.stop_multi_process_pool(pool)
+        return embeddings.astype(np.float32, copy=False)
+
+    def embed_properties(self, properties: List[Property], batch_size: Optional[int] = None,
+                         cache: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        """Embed the text representation of each property, reusing vectors cached by text"""
+        if not properties:
+            raise ValueError("No properties provided to load")
+        # Texts per encoder forward pass; raise on large GPUs, lower if long texts run out of memory
+        batch_size = batch_size or Config.load().embed_batch_size
+        texts = [prop.to_embedding_text() for prop in properties]
+        # Listings re-published with identical text only need to be encoded once
+        slots: Dict[str, int] = {}
+        inverse = np.fromiter((slots.setdefault(text, len(slots)) for text in texts), dtype=np.intp, count=len(texts))
+        unique_texts = list(slots)
+
+        cache = cache or {}
+        to_encode = [text for text in unique_texts if text not in cache]
+        if not to_encode:
+            encoded = None
+        elif _cuda_device_count() > 1 and len(to_encode) >= MULTI_GPU_MIN_TEXTS:
+            encoded = self._embed_multi_gpu(to_encode, batch_size=batch_size)
+        elif _embedding_device() == "cuda" and len(to_encode) > batch_size:
+            encoded = self._embed_pipelined(to_encode, batch_size=batch_size)
+        else:
+            encoded = self._embed_documents(to_encode, batch_size=batch_size)
+
+        if len(to_encode) == len(unique_texts):
+            embeddings = encoded
+        else:
+            encoded_rows = dict(zip(to_encode, encoded)) if encoded is not None else {}
+            embeddings = np.vstack([
+                cache[text] if text in cache else encoded_rows[text] for text in unique_texts
+            ]).astype(np.float32, copy=False)
+        return embeddings if len(unique_texts) == len(texts) else embeddings[inverse]
+
+    def _build_matrix(self, embeddings: np.ndarray, properties: List[Property]) -> None:
+        """Keep embeddings as one contiguous matrix with unit-length rows
+
+        Large catalogs also get int8 codes and an HNSW graph; with an index cache set,
+        both are loaded from disk when saved for the same snapshot, and saved otherwise.
+        """
+        mapped = isinstance(embeddings, np.memmap) and embeddings.dtype == np.float32
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        # Snapshot rows are the encoder's unit-length output; checking them would read a mapped file in full
+        if self._index_cache is None or not matrix.flags.c_contiguous:
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            # Rows from the encoder are already unit length; only copy when they are not,
+            # so a memory-mapped snapshot stays mapped
+            if not (matrix.flags.c_contiguous and np.allclose(norms, 1.0, atol=1e-3)):
+                norms[norms == 0] = 1.0
+                matrix = np.ascontiguousarray(matrix / norms)
+                mapped = False
+        # SimSIMD has native f16 kernels, so half precision halves the bytes per scan without
+        # changing the ranking; NumPy would upcast the whole matrix per query, so it keeps float32.
+        # A mapped snapshot also stays float32, served from the page cache rather than a private copy
+        self._matrix = matrix.astype(np.float16) if simsimd is not None and not mapped else matrix
+        self._props_list = list(properties)
+
+        settings = Config.load()
+        self._matrix_i8 = None
+        if simsimd is not None and len(matrix) >= settings.int8_min_items:
+            # A quarter of the bytes per scan; cosine ignores the per-row scale
+            self._matrix_i8 = self._load_or_build_i8(matrix)
+
+        self._hnsw = None
+        if hnswlib is not None and len(matrix) >= settings.hnsw_min_items:
+            # Sub-linear top-k once an exact scan stops being cheap; labels are row numbers
+            self._hnsw = self._load_or_build_hnsw(matrix)
+
+    def _load_or_build_i8(self, matrix: np.ndarray) -> np.ndarray:
+        cache = self._index_cache
+        if cache is not None:
+            path = load_index_part(*cache, I8_CACHE_FILE)
+            if path is not None:
+                codes = np.load(path, mmap_mode='r')
+                if codes.shape == matrix.shape and codes.dtype == np.int8:
+                    return codes
+
+        codes = self._quantize_i8(matrix)
+        if cache is not None:
+            def write(path: str) -> None:
+                with open(path, 'wb') as f:
+                    np.save(f, codes)
+            save_index_part(*cache, I8_CACHE_FILE, write)
+        return codes
+
+    def _load_or_build_hnsw(self, matrix: np.ndarray):
+        cache = self._index_cache
+        index = hnswlib.Index(space="ip", dim=matrix.shape[1])
+        path = load_index_part(*cache, HNSW_CACHE_FILE) if cache is not None else None
+        loaded = False
+        if path is not None:
+            try:
+                index.load_index(path, max_elements=len(matrix))
+                loaded = index.get_current_count() == len(matrix)
+            except RuntimeError as e:
+                print(f"Ignoring unreadable HNSW index {path}: {str(e)}")
+            if not loaded:
+                index = hnswlib.Index(space="ip", dim=matrix.shape[1])
+
+        if not loaded:
+            index.init_index(max_elements=len(matrix), M=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION)
+            index.add_items(matrix, np.arange(len(matrix)))
+            if cache is not None:
+                save_index_part(*cache, HNSW_CACHE_FILE, index.save_index)
+        index.set_ef(HNSW_EF_SEARCH)
+        return index
+
+    @staticmethod
+    def _quantize_i8(vectors: np.ndarray) -> np.ndarray:
+        """Symmetric per-row int8 quantization"""
+        vectors = np.atleast_2d(vectors)
+        peak = np.abs(vectors).max(axis=1, keepdims=True)
+        peak[peak == 0] = 1.0
+        return np.ascontiguousarray(np.round(vectors * (127.0 / peak)), dtype=np.int8)
+
+    def _search_matrix(self, embedding: np.ndarray, top_k: int) -> List[PropertyMatch]:
+        """Cosine top-k over the embedding matrix: one exact scan, or HNSW for very large catalogs"""
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        if self._hnsw is not None:
+            k = min(top_k, len(self._props_list))
+            if k > HNSW_EF_SEARCH:
+                self._hnsw.set_ef(k)
+            labels, distances = self._hnsw.knn_query(query, k=k)
+            # hnswlib's "ip" distance is 1 - inner product
+            return self._to_matches(labels[0], 1.0 - distances[0])
+
+        if self._matrix_i8 is not None:
+            # Coarse int8 cosine scan, then exact float32 scores for the best candidates only
+            distances = np.asarray(
+                simsimd.cdist(self._quantize_i8(query), self._matrix_i8, metric="cosine"), dtype=np.float32
+            ).ravel()
+            n_candidates = min(top_k * INT8_OVERSAMPLE, len(distances))
+            candidates = np.argpartition(distances, n_candidates - 1)[:n_candidates]
+            exact = self._matrix[candidates].astype(np.float32) @ query
+            order = np.argsort(-exact)[:top_k]
+            return self._to_matches(candidates[order], exact[order])
+
+        if _fused_topk is not None and self._matrix.dtype == np.float32:
+            # No allocation of a full score vector and no separate partition/sort
+            top_idx, top_scores = _fused_topk(self._matrix, query, min(top_k, len(self._props_list)))
+            return self._to_matches(top_idx, top_scores)
+
+        if simsimd is not None:
+            # SIMD dot-product kernels (AVX-512/NEON); rows and query are unit length already
+            query = query.astype(self._matrix.dtype)
+            scores = np.asarray(simsimd.cdist(query[None, :], self._matrix, metric="dot"), dtype=np.float32).ravel()
+        else:
+            scores = self._matrix @ query
+
+        if top_k < len(scores):
+            top_idx = np.argpartition(-scores, top_k)[:top_k]
+        else:
+            top_idx = np.arange(len(scores))
+        top_idx = top_idx[np.argsort(-scores[top_idx])]
+
+        return self._to_matches(top_idx, scores[top_idx])
+
+    def _to_matches(self, rows: np.ndarray, scores: np.ndarray) -> List[PropertyMatch]:
+        """Pair matrix rows with their properties; tolist() converts every score in one call"""
+        return list(map(PropertyMatch._make, zip(map(self._props_list.__getitem__, rows), scores.tolist())))
+
+    def search_batch(self, queries: List[str], top_k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k for many queries at once as (rows, scores) arrays, rows indexing the loaded properties
+
+        Skips building PropertyMatch objects, for bulk scoring and evaluation.
+        """
+        if self._matrix is None:
+            raise RuntimeError("search_batch needs properties loaded into the in-process matrix")
+        queries_matrix = self.embed_queries(queries).astype(np.float32)
+        norms = np.linalg.norm(queries_matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        queries_matrix /= norms
+        if simsimd is not None:
+            scores = np.asarray(
+                simsimd.cdist(queries_matrix.astype(self._matrix.dtype), self._matrix, metric="dot"), dtype=np.float32
+            )
+        else:
+            scores = queries_matrix @ self._matrix.T
+
+        k = min(top_k, scores.shape[1])
+        rows = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(scores, rows, axis=1)
+        order = np.argsort(-top, axis=1)
+        return np.take_along_axis(rows, order, axis=1), np.take_along_axis(top, order, axis=1)
+
+    def search(self, query: str, top_k: int = 5) -> List[PropertyMatch]:
+        """Search for properties matching the query"""
+        return self.search_by_vector(self.embed(query), top_k=top_k)
 
     def _create_documents(self, properties: List[Property]) -> List[Document]:
         """Convert properties to LangChain documents"""
-        documents = []
-        for prop in properties:
-            # Filter out None values and convert numbers to appropriate types
-            metadata = {
-                "id": prop.id,
-                "price": float(prop.price),
-                "type": str(prop.type),
-                "town": str(prop.town),
-                "beds": int(prop.beds) if prop.beds is not None else 0,
-                "baths": int(prop.baths) if prop.baths is not None else 0,
-                "surface_area": float(prop.surface_area_built) if prop.surface_area_built is not None else 0.0
-            }
-
-            doc = Document(
+        _Document = Document  # local binding avoids a global lookup per property
+        documents = [
+            _Document(
                 page_content=prop.to_embedding_text(),
-                metadata=metadata
+                # Filter out None values and convert numbers to appropriate types
+                metadata={
+                    "id": prop.id,
+                    "price": float(prop.price),
+                    "type": str(prop.type),
+                    "town": str(prop.town),
+                    "beds": int(prop.beds) if prop.beds is not None else 0,
+                    "baths": int(prop.baths) if prop.baths is not None else 0,
+                    "surface_area": float(prop.surface_area_built) if prop.surface_area_built is not None else 0.0
+                }
             )
-            documents.append(doc)
-            self.properties[prop.id] = prop
+            for prop in properties
+        ]
+        self.properties.update((prop.id, prop) for prop in properties)
         return documents
@@ -1,10 +1,11 @@
 import os
 import shutil
-from typing import List, Dict, Any
+import sqlite3
+from typing import List
 import chromadb
+import numpy as np
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
-from langchain_community.vectorstores.utils import filter_complex_metadata
 
 from .base import PropertyVectorStore
 from models.property import Property, PropertyMatch
@@ -30,54 +31,14 @@ class ChromaPropertyStore(PropertyVectorStore):
             shutil.rmtree(directory)
         os.makedirs(directory, exist_ok=True)
 
-    def _process_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
-        """Process metadata to ensure it's compatible with ChromaDB"""
-        processed = {}
-        for key, value in metadata.items():
-            if value is None:
-                if key in ['beds', 'baths']:
-                    processed[key] = '0'
-                elif key in ['surface_area_built', 'surface_area_plot', 'price']:
-                    processed[key] = '0.0'
-                else:
-                    processed[key] = ''
-            elif isinstance(value, list):
-                processed[key] = ', '.join(map(str, value)) if value else ''
-            elif isinstance(value, (int, float)):
-                processed[key] = str(value)
-            elif isinstance(value, bool):
-                processed[key] = str(value).lower()
-            elif isinstance(value, dict):
-                # For nested dictionaries like description
-                if key == 'desc' and 'es' in value:
-                    processed[key] = value['es']
-                else:
-                    processed[key] = str(value)
-            else:
-                processed[key] = str(value)
-        
-        return processed
-
     def _create_documents(self, properties: List[Property]) -> List[Document]:
         """Create Langchain documents with property data"""
-        documents = []
-        for prop in properties:
-            # Use the property's embedding text method
-            text = prop.to_embedding_text()
-            
-            # Process metadata to ensure compatibility
-            metadata = self._process_metadata(prop.dict())
-            
-            # Create document
-            doc = Document(
-                page_content=text,
-                metadata=metadata
-            )
-            documents.append(doc)
-            
-            # Store reference to property
-            self.properties[str(prop.id)] = prop
-            
+        # Search resolves hits through self.properties, so the stored metadata is just the id
+        documents = [
+            Document(page_content=prop.to_embedding_text(), metadata={'id': str(prop.id)})
+            for prop in properties
+        ]
+        self.properties.update((str(prop.id), prop) for prop in properties)
         return documents
 
     def _initialize_store(self):
@@ -100,9 +61,32 @@ class ChromaPropertyStore(PropertyVectorStore):
             client=client,
             collection_name="properties",
             embedding_function=self.embeddings,
+            # Embeddings are unit length, so inner product ranks exactly like cosine without the norms
+            collection_metadata={"hnsw:space": "ip"},
             persist_directory=self.chroma_data_directory if self.storage_mode == StorageMode.DISK else None
         )
 
+    def _enable_wal(self) -> None:
+        """Switch the persistent SQLite file to write-ahead logging before bulk writes"""
+        # journal_mode is stored in the database file, so it also applies to the connections
+        # chromadb opens itself (from Rust in current releases), which this process cannot tune
+        db_file = os.path.join(self.chroma_data_directory, 'chroma.sqlite3')
+        if not os.path.exists(db_file):
+            return
+        try:
+            with sqlite3.connect(db_file) as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.Error as e:
+            print(f"Could not enable WAL for {db_file}: {str(e)}")
+
+    def _max_batch_size(self) -> int:
+        """Largest number of records chromadb accepts in a single write"""
+        client = self.vector_store._client
+        try:
+            return client.get_max_batch_size()
+        except AttributeError:  # older chromadb releases expose it as a property
+            return getattr(client, 'max_batch_size', 5461)
+
     def clear(self) -> None:
         """Clear the vector store"""
         if self.storage_mode == StorageMode.DISK and self.chroma_data_directory:
@@ -110,6 +94,10 @@ class ChromaPropertyStore(PropertyVectorStore):
 
         self.vector_store = None
         self.properties = {}
+        self._matrix = None
+        self._props_list = []
+        self._hnsw = None
+        self._matrix_i8 = None
         self._initialize_store()
 
     def needs_loading(self) -> bool:
@@ -127,11 +115,18 @@ class ChromaPropertyStore(PropertyVectorStore):
         except Exception:
             return True
 
-    def load_properties(self, properties: List[Property]) -> None:
-        """Load properties into the vector store"""
+    def load_precomputed(self, embeddings: np.ndarray, properties: List[Property]) -> None:
+        """Load properties into the vector store using precomputed embeddings"""
         if not properties:
             raise ValueError("No properties provided to load")
             
+        if self.storage_mode != StorageMode.DISK:
+            # An in-memory collection would only duplicate the matrix that every search uses
+            self._create_documents(properties)
+            self._build_matrix(embeddings, properties)
+            print(f"Successfully loaded {len(properties)} properties into the in-process index")
+            return
+
         try:
             # Create documents and gather data for ChromaDB
             documents = self._create_documents(properties)
@@ -141,14 +136,26 @@ class ChromaPropertyStore(PropertyVectorStore):
             
             # Initialize fresh store
             self._initialize_store()
+            if self.chroma_data_directory:
+                self._enable_wal()
             
-            # Add texts to ChromaDB
+            # Add texts to ChromaDB along with their embeddings
             if texts:  # Only try to add if we have texts
-                self.vector_store.add_texts(
-                    texts=texts,
-                    metadatas=metadatas,
-                    ids=ids
-                )
+                collection = self.vector_store._collection
+                # A fresh collection takes plain adds; only a reused one needs upsert's id lookups
+                write = collection.add if collection.count() == 0 else collection.upsert
+                vectors = embeddings.tolist()
+                # chromadb rejects writes larger than the client's maximum batch size
+                step = self._max_batch_size()
+                for start in range(0, len(ids), step):
+                    end = start + step
+                    write(
+                        ids=ids[start:end],
+                        embeddings=vectors[start:end],
+                        metadatas=metadatas[start:end],
+                        documents=texts[start:end]
+                    )
+                self._build_matrix(embeddings, properties)
                 print(f"Successfully stored {len(properties)} properties in vector store")
             else:
                 raise ValueError("No valid texts to store in vector database")
@@ -157,8 +164,12 @@ class ChromaPropertyStore(PropertyVectorStore):
             print(f"Detailed error during property loading: {str(e)}")
             raise Exception(f"Failed to load properties into ChromaDB: {str(e)}")
 
-    def search(self, query: str, top_k: int = 5) -> List[PropertyMatch]:
-        """Search for properties matching the query"""
+    def search_by_vector(self, embedding: np.ndarray, top_k: int = 5) -> List[PropertyMatch]:
+        """Search for properties closest to a precomputed query embedding"""
+        # Properties loaded in this process are searched directly on the embedding matrix
+        if self._matrix is not None:
+            return self._search_matrix(embedding, top_k)
+
         if not self.vector_store:
             try:
                 self._initialize_store()
@@ -167,37 +178,22 @@ class ChromaPropertyStore(PropertyVectorStore):
                 return []
 
         try:
-            results = self.vector_store.similarity_search_with_relevance_scores(
-                query, k=top_k
+            results = self.vector_store.similarity_search_by_vector_with_relevance_scores(
+                embedding.tolist(), k=top_k
             )
+            # The by-vector variant returns raw distances; convert them the same
+            # way similarity_search_with_relevance_scores does
+            relevance_score_fn = self.vector_store._select_relevance_score_fn()
             
             matches = []
-            for doc, score in results:
-                # Reconstruct property data from metadata
-                property_data = {}
-                for key, value in doc.metadata.items():
-                    if key == 'features':
-                        property_data[key] = value.split(', ') if value else []
-                    elif key == 'desc':
-                        property_data[key] = {'es': value} if value else {'es': ''}
-                    elif key == 'images':
-                        property_data[key] = [{'url': url.strip()} for url in value.split(', ')] if value else []
-                    elif key in ['beds', 'baths']:
-                        property_data[key] = int(value) if value else None
-                    elif key in ['surface_area_built', 'surface_area_plot', 'price']:
-                        property_data[key] = float(value) if value else None
-                    elif value == "":
-                        property_data[key] = None
-                    elif value.lower() in ('true', 'false'):
-                        property_data[key] = value.lower() == 'true'
-                    else:
-                        property_data[key] = value
-                
-                property_obj = Property(**property_data)
+            for doc, distance in results:
+                prop = self.properties.get(doc.metadata.get('id'))
+                if prop is None:
+                    continue
                 matches.append(
                     PropertyMatch(
-                        property=property_obj,
-                        similarity=score
+                        property=prop,
+                        similarity=float(relevance_score_fn(distance))
                     )
                 )
             return matches
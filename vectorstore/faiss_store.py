@@ -1,25 +1,176 @@
 import os
+import json
+import pickle
 import shutil
-from typing import List
+import hashlib
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 from models.property import Property, PropertyMatch
+from utils.cpu import compute_threads
 from .base import PropertyVectorStore
 
+# With the binary prefilter enabled, exhaustive indexes this large are searched by Hamming
+# distance over embedding sign bits, then the best top_k * rescore factor candidates are
+# rescored against the main index. Sign bits rank coarsely, so the factor must stay large
+# (about 0.96 recall@5 at 40x on clustered data, under 0.6 at 4x)
+BINARY_PREFILTER_MIN_ITEMS = 10000
+BINARY_RESCORE_FACTOR = 40
+
+@lru_cache(maxsize=1)
+def _configure_faiss_runtime() -> None:
+    """Report a generic FAISS build and size its OpenMP pool, once per process"""
+    # faiss-cpu wheels load their AVX2/AVX-512 (or NEON) build at import when the CPU supports it
+    if not any(isa in faiss.get_compile_options() for isa in ("AVX2", "AVX512", "NEON")):
+        print("FAISS is running its generic build; install a faiss-cpu wheel with AVX2/AVX-512 support for faster search")
+    # An explicit OMP_NUM_THREADS wins over the detected core count
+    if "OMP_NUM_THREADS" not in os.environ:
+        faiss.omp_set_num_threads(compute_threads())
+
 class FAISSPropertyStore(PropertyVectorStore):
-    def __init__(self, persist_directory: str, embedding_model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, persist_directory: str, embedding_model_name: str = "all-MiniLM-L6-v2",
+                 index_type: str = "SQ8", nprobe: int = 8, ef_search: int = 64,
+                 binary_prefilter: bool = False, binary_rescore_factor: int = BINARY_RESCORE_FACTOR):
         super().__init__(embedding_model_name)
+        _configure_faiss_runtime()
         self.persist_directory = persist_directory
+        self.index_type = index_type
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.binary_prefilter = binary_prefilter
+        self.binary_rescore_factor = binary_rescore_factor
+        self._binary_index: Optional[faiss.IndexBinary] = None
         self.index_file = os.path.join(persist_directory, "index.faiss")
-        self.store_file = os.path.join(persist_directory, "store.pkl")
+        # Names written by FAISS.save_local
+        self.store_file = os.path.join(persist_directory, "index.pkl")
+        self.manifest_file = os.path.join(persist_directory, "manifest.json")
+        # Packed sign bits behind the binary prefilter, one row of d/8 bytes per vector
+        self.bits_file = os.path.join(persist_directory, "bits.npy")
         self._initialize_store()
 
     def _initialize_store(self):
         """Initialize or load existing FAISS store"""
+        if self.vector_store is not None:
+            # Already opened by the constructor; reading again would re-map the index and unpickle the docstore
+            return
         if os.path.exists(self.index_file) and os.path.exists(self.store_file):
-            self.vector_store = FAISS.load_local(
-                self.persist_directory,
-                self.embeddings
+            # Map the index file instead of reading it into private memory: pages load on demand
+            # and are shared through the page cache. The store never adds to a loaded index.
+            try:
+                index = faiss.read_index(self.index_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                # Older faiss builds cannot map every index type
+                index = faiss.read_index(self.index_file)
+            # Same (docstore, index_to_docstore_id) pickle FAISS.load_local reads; written by this store
+            with open(self.store_file, 'rb') as f:
+                docstore, index_to_docstore_id = pickle.load(f)
+            self.vector_store = FAISS(
+                embedding_function=self.embeddings,
+                index=index,
+                docstore=docstore,
+                index_to_docstore_id=index_to_docstore_id,
+                distance_strategy=(DistanceStrategy.MAX_INNER_PRODUCT
+                                   if index.metric_type == faiss.METRIC_INNER_PRODUCT
+                                   else DistanceStrategy.EUCLIDEAN_DISTANCE)
             )
+            self._configure_index(index)
+
+    def _configure_index(self, index: faiss.Index) -> None:
+        """Apply query-time parameters to IVF and HNSW indexes"""
+        try:
+            faiss.extract_index_ivf(index).nprobe = self.nprobe
+        except RuntimeError:
+            # Not an IVF index (e.g. Flat), nothing to tune
+            pass
+        hnsw = self._hnsw_graph(index)
+        if hnsw is not None:
+            hnsw.efSearch = self.ef_search
+
+    @staticmethod
+    def _hnsw_graph(index: faiss.Index):
+        """The HNSW graph of an HNSW index (e.g. 'HNSW32'), or None"""
+        return getattr(faiss.downcast_index(index), 'hnsw', None)
+
+    def _resolve_index_type(self, n_vectors: int) -> str:
+        """Fill in an '{nlist}' placeholder (e.g. 'IVF{nlist},PQ16') sized to the catalog"""
+        # ~4*sqrt(N) inverted lists keeps both the coarse and the per-list scan small
+        nlist = max(1, int(4 * np.sqrt(n_vectors)))
+        return self.index_type.replace("{nlist}", str(nlist))
+
+    def _build_index(self, vectors: np.ndarray) -> faiss.Index:
+        """Build and train the configured FAISS index over the property vectors"""
+        dimension = vectors.shape[1]
+        # Vectors are unit length, so inner product is cosine similarity
+        index = faiss.index_factory(dimension, self._resolve_index_type(len(vectors)), faiss.METRIC_INNER_PRODUCT)
+        if not index.is_trained:
+            try:
+                index.train(vectors)
+            except RuntimeError as e:
+                # IVF/PQ need more training points than small catalogs provide
+                print(f"Cannot train '{self.index_type}' index on {len(vectors)} properties, using Flat: {e}")
+                index = faiss.IndexFlatIP(dimension)
+        hnsw = self._hnsw_graph(index)
+        if hnsw is not None:
+            # Build-time graph quality; only affects load time, not query cost
+            hnsw.efConstruction = 200
+        index.add(vectors)
+        self._configure_index(index)
+        return index
+
+    @classmethod
+    def _is_exhaustive(cls, index: faiss.Index) -> bool:
+        """Whether the index scans every vector per query (Flat, SQ), unlike IVF or HNSW"""
+        try:
+            faiss.extract_index_ivf(index)
+            return False
+        except RuntimeError:
+            return cls._hnsw_graph(index) is None
+
+    def _use_binary_prefilter(self, index: faiss.Index) -> bool:
+        """Only when enabled, and only in place of a full scan, never of a configured IVF/HNSW search"""
+        return (self.binary_prefilter and index.ntotal >= BINARY_PREFILTER_MIN_ITEMS
+                and index.d % 8 == 0 and self._is_exhaustive(index))
+
+    @staticmethod
+    def _build_binary_index(codes: np.ndarray, index: faiss.Index) -> faiss.IndexBinary:
+        """One bit per dimension (its sign): 32x fewer bytes, compared with popcount"""
+        binary_index = faiss.IndexBinaryFlat(codes.shape[1] * 8)
+        binary_index.add(np.ascontiguousarray(codes))
+        try:
+            # Rescoring reconstructs candidate vectors, which IVF indexes need a direct map for
+            faiss.extract_index_ivf(index).make_direct_map()
+        except RuntimeError:
+            # Flat and scalar-quantized indexes reconstruct directly
+            pass
+        return binary_index
+
+    def _similarity(self, score: float) -> float:
+        """Turn a raw FAISS score into a similarity"""
+        if self.vector_store.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            return float(score)
+        # Indexes saved before the switch to inner product hold squared L2 distances
+        return 1 / (1 + float(score))
+
+    @staticmethod
+    def binary_prefilter_search(binary_index: faiss.IndexBinary, index: faiss.Index, query: np.ndarray,
+                                top_k: int, rescore_factor: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Hamming prefilter on sign bits, then inner product against the main index's vectors, as (rows, scores)"""
+        n_candidates = min(top_k * rescore_factor, binary_index.ntotal)
+        _, labels = binary_index.search(np.packbits(query > 0, axis=1), n_candidates)
+        candidates = labels[0][labels[0] >= 0]
+        scores = index.reconstruct_batch(candidates) @ query[0]
+        order = np.argsort(-scores)[:top_k]
+        return candidates[order], scores[order]
+
+    def _search_binary(self, query: np.ndarray, top_k: int) -> List[PropertyMatch]:
+        rows, scores = self.binary_prefilter_search(
+            self._binary_index, self.vector_store.index, query, top_k, self.binary_rescore_factor
+        )
+        return self._to_matches(rows, scores)
 
     def needs_loading(self) -> bool:
         """Check if the store needs to be loaded with data"""
@@ -30,54 +181,154 @@ class FAISSPropertyStore(PropertyVectorStore):
         """Clear the vector store"""
         if self.vector_store:
             self.vector_store = None
+        self.properties = {}
+        self._props_list = []
+        self._binary_index = None
         if self.persist_directory:
             shutil.rmtree(self.persist_directory, ignore_errors=True)
         os.makedirs(self.persist_directory, exist_ok=True)
 
-    def load_properties(self, properties: List[Property]) -> None:
-        """Load properties into the vector store"""
-        # Clear existing data
-        self.clear()
-        
+    def attach_properties(self, properties: List[Property], embeddings: Optional[np.ndarray] = None) -> None:
+        """Register the properties behind the saved index; FAISS searches its own index"""
+        super().attach_properties(properties)
+        if self.vector_store is None:
+            return
+        # Resolve every index row to its property once, so searches skip the docstore
+        docstore = self.vector_store.docstore
+        rows = []
+        for i in range(self.vector_store.index.ntotal):
+            doc = docstore.search(self.vector_store.index_to_docstore_id[i])
+            prop = self.properties.get(doc.metadata.get("id")) if hasattr(doc, "metadata") else None
+            if prop is None:
+                # The feed no longer matches the saved index; keep resolving hits by id
+                return
+            rows.append(prop)
+        self._props_list = rows
+
+        # Restore the binary prefilter from the saved sign bits instead of the float vectors, but
+        # only if the manifest says they were written with the index for exactly these rows
+        index = self.vector_store.index
+        if self._use_binary_prefilter(index) and os.path.exists(self.bits_file):
+            manifest = self._read_manifest()
+            content_hash = manifest.get('content_hash')
+            if content_hash and manifest.get('bits_content_hash') == content_hash == self._content_hash(rows):
+                codes = np.load(self.bits_file, mmap_mode='r')
+                if codes.shape == (index.ntotal, index.d // 8):
+                    self._binary_index = self._build_binary_index(codes, index)
+
+    def _content_hash(self, properties: List[Property]) -> str:
+        """Fingerprint of everything the saved index depends on, in row order"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.embedding_model_id}|{self.index_type}\n".encode('utf-8'))
+        for prop in properties:
+            digest.update(f"{prop.id}\x00{prop.to_embedding_text()}\x01".encode('utf-8'))
+        return digest.hexdigest()
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _saved_content_hash(self) -> Optional[str]:
+        return self._read_manifest().get('content_hash')
+
+    def load_precomputed(self, embeddings: np.ndarray, properties: List[Property]) -> None:
+        """Load properties into the vector store using precomputed embeddings"""
+        vectors = np.array(embeddings, dtype=np.float32, order='C')
+        faiss.normalize_L2(vectors)
+        content_hash = self._content_hash(properties)
+
+        if self.vector_store is not None and self._saved_content_hash() == content_hash:
+            # The saved index was built from exactly these rows; skip the rebuild and save
+            self._create_documents(properties)
+        else:
+            # Clear existing data
+            self.clear()
+            self._build_store(vectors, properties)
+            # Save to disk
+            os.makedirs(self.persist_directory, exist_ok=True)
+            self.vector_store.save_local(self.persist_directory)
+            manifest = {'content_hash': content_hash, 'count': len(properties)}
+            if self._use_binary_prefilter(self.vector_store.index):
+                np.save(self.bits_file, np.packbits(vectors > 0, axis=1))
+                # Written before the manifest, so sign bits without a matching entry are never trusted
+                manifest['bits_content_hash'] = content_hash
+            with open(self.manifest_file, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+
+        # FAISS row i is properties[i], so searches can skip the docstore
+        self._props_list = list(properties)
+        if self._use_binary_prefilter(self.vector_store.index):
+            self._binary_index = self._build_binary_index(np.packbits(vectors > 0, axis=1), self.vector_store.index)
+
+    def _build_store(self, vectors: np.ndarray, properties: List[Property]) -> None:
+        """Build the index and LangChain wrapper for normalized vectors"""
         # Create and store new documents
         documents = self._create_documents(properties)
-        self.vector_store = FAISS.from_documents(
-            documents,
-            self.embeddings
+        docstore_ids = [str(i) for i in range(len(documents))]
+        index = self._build_index(vectors)
+        self.vector_store = FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+            docstore=InMemoryDocstore(dict(zip(docstore_ids, documents))),
+            index_to_docstore_id=dict(enumerate(docstore_ids))
         )
-        
-        # Save to disk
-        os.makedirs(self.persist_directory, exist_ok=True)
-        self.vector_store.save_local(self.persist_directory)
 
-    def search(self, query: str, top_k: int = 5) -> List[PropertyMatch]:
+    @staticmethod
+    def _normalize_query(embedding: np.ndarray) -> np.ndarray:
+        """Queries as unit-length (n, d) float32 rows, matching the indexed vectors"""
+        query = np.atleast_2d(np.array(embedding, dtype=np.float32, order='C'))
+        faiss.normalize_L2(query)
+        return query
+
+    def search_by_vector(self, embedding: np.ndarray, top_k: int = 5) -> List[PropertyMatch]:
         if not self.vector_store:
             return []
 
+        if self._props_list and self.vector_store.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            # Map FAISS labels straight to rows instead of going through docstore ids and metadata;
+            # legacy L2 indexes return distances, so they keep the docstore path and _similarity()
+            query = self._normalize_query(embedding)
+            if self._binary_index is not None:
+                return self._search_binary(query, top_k)
+            scores, labels = self.vector_store.index.search(query, top_k)
+            found = labels[0] >= 0
+            # Inner product of unit vectors is already the cosine similarity
+            return self._to_matches(labels[0][found], scores[0][found])
+
         # Search documents
-        results = self.vector_store.similarity_search_with_score(query, k=top_k)
+        results = self.vector_store.similarity_search_with_score_by_vector(
+            self._normalize_query(embedding)[0].tolist(), k=top_k
+        )
         
         # Convert to PropertyMatch objects
         matches = []
         for doc, score in results:
             property_id = doc.metadata["id"]
             if property_id in self.properties:
-                # Convert FAISS distance to similarity score (FAISS returns L2 distance)
-                similarity = 1 / (1 + score)
                 matches.append(PropertyMatch(
                     property=self.properties[property_id],
-                    similarity=similarity
+                    similarity=self._similarity(score)
                 ))
         
         return matches
 
+    def search_batch(self, queries: List[str], top_k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k for many queries in one FAISS call as (rows, scores); missing hits have row -1"""
+        if not self.vector_store or not self._props_list:
+            raise RuntimeError("search_batch needs properties attached to a loaded FAISS index")
+        index = self.vector_store.index
+        scores, labels = index.search(self._normalize_query(self.embed_queries(queries)), top_k)
+        if index.metric_type != faiss.METRIC_INNER_PRODUCT:
+            # Same conversion as _similarity() for indexes saved with squared L2 distances
+            scores = 1 / (1 + scores)
+        return labels, scores
+
     @classmethod
     def load_local(cls, persist_directory: str, embedding_model_name: str = "all-MiniLM-L6-v2") -> 'FAISSPropertyStore':
         """Load existing FAISS index"""
-        instance = cls(persist_directory, embedding_model_name)
-        if os.path.exists(instance.index_file):
-            instance.vector_store = FAISS.load_local(
-                persist_directory,
-                instance.embeddings
-            )
-        return instance
+        # The constructor already opens a saved index
+        return cls(persist_directory, embedding_model_name)